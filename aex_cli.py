@@ -45,9 +45,11 @@ def setup_environment():
     # Create required directories
     required_dirs = ['outputs', 'visualizations', 'backups']
     for directory in required_dirs:
-        if not os.path.exists(directory):
-            logger.info(f"Creating {directory} directory...")
-            os.makedirs(directory, exist_ok=True)
+        try:
+            os.makedirs(directory)
+            logger.info(f"Created {directory} directory")
+        except FileExistsError:
+            pass
     
     # Check for required files
     required_files = [
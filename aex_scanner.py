@@ -14,7 +14,7 @@ from openpyxl.styles import PatternFill, Font
 import logging
 import random
 import requests
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
+from http_session import get_session, TRANSIENT_ERRORS
 
 # Setup logging
 logging.basicConfig(
@@ -93,7 +93,7 @@ class AEXScanner:
         retries = 0
         while retries <= self.max_retries:
             try:
-                stock = yf.Ticker(ticker)
+                stock = yf.Ticker(ticker, session=get_session())
                 info = stock.info
                 
                 # Check if response seems valid
@@ -117,7 +117,7 @@ class AEXScanner:
                 
                 return data
                 
-            except (ConnectionError, Timeout, HTTPError) as e:
+            except TRANSIENT_ERRORS as e:
                 if retries < self.max_retries:
                     retries += 1
                     wait_time = self.retry_delay * (2 ** retries) * (1 + random.random())  # Exponential backoff with jitter
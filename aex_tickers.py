@@ -9,19 +9,41 @@ Usage:
     python aex_tickers.py --update-json  # Update JSON file from CSV
 """
 
-import json
+import orjson
+import re
 import os
 import logging
 import sys
 import argparse
 import csv
+import itertools
 import time
 import shutil
 from datetime import datetime
+from file_utils import write_atomic
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Matches whole-line // comments in otherwise valid JSON files
+JSON_COMMENT_PATTERN = re.compile(rb'(?m)^\s*//.*$')
+
+def load_commented_json(json_file):
+    """
+    Load a JSON file that may contain whole-line // comments
+    
+    Args:
+        json_file (str): Path to the JSON file
+        
+    Returns:
+        The parsed JSON content, or None if the file is empty
+    """
+    with open(json_file, 'rb') as f:
+        content = JSON_COMMENT_PATTERN.sub(b'', f.read())
+    if not content.strip():
+        return None
+    return orjson.loads(content)
+
 def update_json_from_csv(tickers, json_file):
     """
     Updates the tickers.json file with tickers from the CSV file
@@ -45,8 +67,8 @@ def update_json_from_csv(tickers, json_file):
     # Update the JSON file
     try:
         data = {"AEX_TICKERS": tickers}
-        with open(json_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        # Write to a temporary file and swap it in so a crash never leaves a truncated file
+        write_atomic(json_file, orjson.dumps(data, option=orjson.OPT_INDENT_2))
         logger.info(f"Updated {json_file} with {len(tickers)} tickers from CSV file")
         return True
     except Exception as e:
@@ -84,16 +106,9 @@ def load_tickers(return_source_info=False, update_json=False):
         if os.path.exists(csv_file):
             csv_tickers = []
             with open(csv_file, 'r') as f:
-                # Skip lines that start with //
-                while True:
-                    pos = f.tell()
-                    line = f.readline()
-                    if not line or not line.startswith('//'):
-                        f.seek(pos)
-                        break
-                
-                # Parse the CSV content
-                reader = csv.DictReader(f)
+                # Skip leading lines that start with // while streaming the rest to the parser
+                lines = itertools.dropwhile(lambda line: line.startswith('//'), f)
+                reader = csv.DictReader(lines)
                 for row in reader:
                     if 'yahoo_ticker' in row and row['yahoo_ticker'].strip():
                         csv_tickers.append(row['yahoo_ticker'].strip())
@@ -124,31 +139,25 @@ def load_tickers(return_source_info=False, update_json=False):
     # Fallback: Try loading from JSON file
     try:
         if os.path.exists(tickers_file):
-            with open(tickers_file, 'r') as f:
-                # Handle commented JSON by skipping lines that start with //
-                json_content = ""
-                for line in f:
-                    if not line.strip().startswith('//'):
-                        json_content += line
-                
-                # Parse the JSON content
-                if json_content:
-                    data = json.loads(json_content)
-                    if 'AEX_TICKERS' in data and len(data['AEX_TICKERS']) > 0:
-                        logger.info(f"Loaded {len(data['AEX_TICKERS'])} tickers from {tickers_file}")
-                        source_info = {
-                            'source': 'json_file',
-                            'reason': 'Successfully loaded from file',
-                            'path': tickers_file,
-                            'tickers_count': len(data['AEX_TICKERS'])
-                        }
-                        if return_source_info:
-                            return data['AEX_TICKERS'], source_info
-                        return data['AEX_TICKERS']
-                else:
-                    logger.warning(f"Invalid ticker data in {tickers_file}, using default tickers")
-                    source_info['reason'] = 'Invalid ticker data in file'
-                    source_info['path'] = tickers_file
+            # Handle commented JSON by stripping lines that start with //
+            data = load_commented_json(tickers_file)
+            
+            if data:
+                if 'AEX_TICKERS' in data and len(data['AEX_TICKERS']) > 0:
+                    logger.info(f"Loaded {len(data['AEX_TICKERS'])} tickers from {tickers_file}")
+                    source_info = {
+                        'source': 'json_file',
+                        'reason': 'Successfully loaded from file',
+                        'path': tickers_file,
+                        'tickers_count': len(data['AEX_TICKERS'])
+                    }
+                    if return_source_info:
+                        return data['AEX_TICKERS'], source_info
+                    return data['AEX_TICKERS']
+            else:
+                logger.warning(f"Invalid ticker data in {tickers_file}, using default tickers")
+                source_info['reason'] = 'Invalid ticker data in file'
+                source_info['path'] = tickers_file
         else:
             logger.warning(f"Tickers file {tickers_file} not found, using default tickers")
             source_info['reason'] = 'File not found'
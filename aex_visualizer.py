@@ -17,10 +17,12 @@ def visualize_latest_results():
     # Define the outputs directory where scanner results are stored
     outputs_dir = 'outputs'
     
-    # Ensure outputs directory exists
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir, exist_ok=True)
+    # Ensure outputs directory exists; creating it directly avoids a separate existence check
+    try:
+        os.makedirs(outputs_dir)
         print(f"Created {outputs_dir} directory.")
+    except FileExistsError:
+        pass
     
     # Find the latest Excel file in the outputs directory
     files = [f for f in os.listdir(outputs_dir) if f.startswith('aex_stock_valuation_') and f.endswith('.xlsx')]
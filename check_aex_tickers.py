@@ -9,16 +9,20 @@ This script helps troubleshoot ticker issues by:
 """
 
 import yfinance as yf
-import pandas as pd
 import time
-import random
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
+import threading
+import argparse
+import functools
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import Retrying, stop_after_attempt, wait_exponential_jitter, retry_if_exception
+import io
+import sys
 import logging
-import colorama
-from colorama import Fore, Style
-
-# Initialize colorama
-colorama.init()
+from yahoo_chart import fetch_charts
+from data_cache import file_cache, INFO_TTL
+from http_session import get_session, TRANSIENT_ERRORS, NON_RETRYABLE_STATUS, http_status
+from terminal_colors import RED, GREEN, YELLOW, CYAN, BLUE, RST
 
 # Setup logging
 logging.basicConfig(
@@ -43,120 +47,260 @@ TYPICAL_AEX_TICKERS = [
     "SHEL.AS", "SHELL.AS"
 ]
 
-def validate_ticker(ticker, max_retries=3):
-    """Validate a ticker and return its data with detailed information"""
-    print(f"\n{Fore.CYAN}Checking {ticker}...{Style.RESET_ALL}")
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    Settings of one checker run, resolved once from the command line
     
-    retries = 0
-    while retries <= max_retries:
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # Check if we received meaningful data
-            if info and len(info) > 5:
-                # Extract key information
-                name = info.get('shortName', info.get('longName', 'Unknown'))
-                price = info.get('currentPrice', info.get('regularMarketPrice', 'N/A'))
-                market_cap = info.get('marketCap', 'N/A')
-                currency = info.get('currency', 'N/A')
-                exchange = info.get('exchange', 'N/A')
-                
-                if market_cap != 'N/A':
-                    market_cap_str = f"{market_cap / 1_000_000_000:.2f} billion {currency}"
-                else:
-                    market_cap_str = 'N/A'
-                
-                print(f"{Fore.GREEN}✓ Valid ticker!{Style.RESET_ALL}")
-                print(f"  Company: {Fore.YELLOW}{name}{Style.RESET_ALL}")
-                print(f"  Price: {price} {currency}")
-                print(f"  Market Cap: {market_cap_str}")
-                print(f"  Exchange: {exchange}")
-                print(f"  Data points: {len(info)}")
-                
-                return {
-                    "ticker": ticker,
-                    "valid": True,
-                    "name": name,
-                    "price": price,
-                    "market_cap": market_cap,
-                    "currency": currency,
-                    "exchange": exchange,
-                    "data_points": len(info)
-                }
-            else:
-                if retries < max_retries:
-                    retries += 1
-                    wait_time = 2 * (2 ** retries) * (1 + random.random())
-                    print(f"{Fore.YELLOW}⚠️ Insufficient data. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries}){Style.RESET_ALL}")
-                    time.sleep(wait_time)
-                else:
-                    print(f"{Fore.RED}❌ Got response but with insufficient data{Style.RESET_ALL}")
-                    return {
-                        "ticker": ticker,
-                        "valid": False,
-                        "error": "Insufficient data",
-                        "data_points": len(info) if info else 0
-                    }
-        except (ConnectionError, Timeout, HTTPError) as e:
-            if retries < max_retries:
-                retries += 1
-                wait_time = 3 * (2 ** retries) * (1 + random.random())
-                print(f"{Fore.YELLOW}⚠️ Connection error: {str(e)}. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries}){Style.RESET_ALL}")
-                time.sleep(wait_time)
-            else:
-                print(f"{Fore.RED}❌ Connection error: {str(e)}{Style.RESET_ALL}")
-                return {
-                    "ticker": ticker,
-                    "valid": False,
-                    "error": f"Connection error: {str(e)}"
-                }
-        except Exception as e:
-            print(f"{Fore.RED}❌ Unexpected error: {str(e)}{Style.RESET_ALL}")
-            return {
-                "ticker": ticker,
-                "valid": False,
-                "error": f"Unexpected error: {str(e)}"
-            }
+    The instance is immutable, so it can be shared with the worker threads.
+    """
+    workers: int = 8          # Number of tickers validated concurrently
+    wait: float = 0.5         # Minimum seconds between the start of two validations
+    full_info: bool = False   # Validate with the full .info instead of fast_info
+    chart_only: bool = False  # Validate from the batched chart requests alone, skipping yfinance
+    use_cache: bool = True    # Serve repeated validations of a ticker from the on-disk cache
+
+class RateLimiter:
+    """
+    Spaces out requests made from several threads
+    
+    Each call to wait() blocks until at least `interval` seconds have passed
+    since the previous caller was let through, so the overall request rate
+    stays at or below 1/interval no matter how many threads are running.
+    """
+    
+    def __init__(self, interval):
+        """Initialize the limiter with the minimum interval in seconds"""
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+@functools.lru_cache(maxsize=512)
+def get_ticker(ticker):
+    """
+    Return a shared yf.Ticker for a symbol
+    
+    Reusing the object (and the shared HTTP session behind it) avoids setting
+    up a new Ticker and connection for every request on the same symbol.
+    """
+    return yf.Ticker(ticker, session=get_session())
+
+def is_transient(error):
+    """Return True for network errors worth retrying"""
+    return isinstance(error, TRANSIENT_ERRORS) and http_status(error) not in NON_RETRYABLE_STATUS
+
+def fetch_quote(stock, full_info=False):
+    """
+    Fetch the key quote fields (name, price, market cap, currency, exchange) of a ticker
+    
+    By default these come from fast_info and the price history metadata, which
+    are served by Yahoo's lightweight chart endpoint; full_info uses the much
+    heavier .info request instead.
     
+    Returns:
+        tuple: (quote dict, or None if the data is insufficient, number of data points received)
+    """
+    if full_info:
+        info = stock.info
+        if not info or len(info) <= 5:
+            return None, len(info) if info else 0
+        return {
+            "name": info.get('shortName', info.get('longName', 'Unknown')),
+            "price": info.get('currentPrice', info.get('regularMarketPrice', 'N/A')),
+            "market_cap": info.get('marketCap', 'N/A'),
+            "currency": info.get('currency', 'N/A'),
+            "exchange": info.get('exchange', 'N/A')
+        }, len(info)
+    
+    metadata = stock.get_history_metadata() or {}
+    fast_info = stock.fast_info
+    price = fast_info.last_price
+    if price is None:
+        return None, len(metadata)
     return {
+        "name": metadata.get('shortName', metadata.get('longName', 'Unknown')),
+        "price": price,
+        "market_cap": fast_info.market_cap or 'N/A',
+        "currency": fast_info.currency or 'N/A',
+        "exchange": fast_info.exchange or 'N/A'
+    }, len(metadata)
+
+def print_valid_ticker(result, cached=False, out=None):
+    """Print the details of a valid ticker to out (stdout by default)"""
+    market_cap = result['market_cap']
+    if market_cap != 'N/A':
+        market_cap_str = f"{market_cap / 1_000_000_000:.2f} billion {result['currency']}"
+    else:
+        market_cap_str = 'N/A'
+    
+    print(f"{GREEN}✓ Valid ticker!{' (cached)' if cached else ''}{RST}", file=out)
+    print(f"  Company: {YELLOW}{result['name']}{RST}", file=out)
+    print(f"  Price: {result['price']} {result['currency']}", file=out)
+    print(f"  Market Cap: {market_cap_str}", file=out)
+    print(f"  Exchange: {result['exchange']}", file=out)
+    print(f"  Data points: {result['data_points']}", file=out)
+
+def validate_from_chart(ticker, chart, out=None):
+    """
+    Validate a ticker from its chart result alone, without any yfinance request
+    
+    Args:
+        ticker (str): The ticker symbol to validate
+        chart (dict): Chart result from yahoo_chart.fetch_charts ({} or None if unavailable)
+        out (file): Stream the progress is printed to (stdout by default)
+    """
+    print(f"\n{CYAN}Checking {ticker}...{RST}", file=out)
+    
+    meta = (chart or {}).get('meta', {})
+    price = meta.get('regularMarketPrice')
+    if price is None:
+        error = "No quote data on Yahoo Finance" if chart == {} else "Chart request failed"
+        print(f"{RED}❌ {error}{RST}", file=out)
+        return {
+            "ticker": ticker,
+            "valid": False,
+            "error": error
+        }
+    
+    # The chart endpoint does not report the market cap
+    result = {
         "ticker": ticker,
-        "valid": False,
-        "error": "Maximum retries exceeded"
+        "valid": True,
+        "name": meta.get('shortName', meta.get('longName', 'Unknown')),
+        "price": price,
+        "market_cap": 'N/A',
+        "currency": meta.get('currency', 'N/A'),
+        "exchange": meta.get('exchangeName', 'N/A'),
+        "data_points": len(meta)
     }
+    print_valid_ticker(result, out=out)
+    return result
+
+def validate_ticker(ticker, max_retries=3, full_info=False, use_cache=True, out=None, limiter=None):
+    """
+    Validate a ticker and return its data with detailed information
+    
+    Args:
+        ticker (str): The ticker symbol to validate
+        max_retries (int): Maximum number of retry attempts
+        full_info (bool): Fetch the full .info instead of the lighter fast_info
+        use_cache (bool): Serve and store valid results in the on-disk cache
+        out (file): Stream the progress is printed to (stdout by default)
+        limiter (RateLimiter, optional): Paces the requests; cache hits do not wait for it
+    """
+    print(f"\n{CYAN}Checking {ticker}...{RST}", file=out)
+    
+    # Valid tickers seen within the last 24 hours need no new requests
+    cache_params = {"full_info": full_info}
+    if use_cache:
+        hit, result = file_cache.get(ticker, 'validation', cache_params, INFO_TTL)
+        if hit:
+            print_valid_ticker(result, cached=True, out=out)
+            return result
+    
+    if limiter:
+        limiter.wait()
+    
+    def report_retry(retry_state):
+        print(f"{YELLOW}⚠️ Connection error: {str(retry_state.outcome.exception())}. "
+              f"Retrying in {retry_state.next_action.sleep:.2f}s (attempt {retry_state.attempt_number}/{max_retries}){RST}", file=out)
+    
+    retrying = Retrying(
+        stop=stop_after_attempt(max_retries + 1),
+        wait=wait_exponential_jitter(initial=2, max=30),
+        retry=retry_if_exception(is_transient),
+        before_sleep=report_retry,
+        reraise=True
+    )
+    
+    try:
+        quote, data_points = retrying(fetch_quote, get_ticker(ticker), full_info)
+    except TRANSIENT_ERRORS as e:
+        print(f"{RED}❌ Connection error: {str(e)}{RST}", file=out)
+        return {
+            "ticker": ticker,
+            "valid": False,
+            "error": f"Connection error: {str(e)}"
+        }
+    except Exception as e:
+        print(f"{RED}❌ Unexpected error: {str(e)}{RST}", file=out)
+        return {
+            "ticker": ticker,
+            "valid": False,
+            "error": f"Unexpected error: {str(e)}"
+        }
+    
+    # A successful response without data means Yahoo has no data for the
+    # ticker, which retrying will not change
+    if not quote:
+        print(f"{RED}❌ Got response but with insufficient data{RST}", file=out)
+        return {
+            "ticker": ticker,
+            "valid": False,
+            "error": "Insufficient data",
+            "data_points": data_points
+        }
+    
+    result = {
+        "ticker": ticker,
+        "valid": True,
+        "name": quote['name'],
+        "price": quote['price'],
+        "market_cap": quote['market_cap'],
+        "currency": quote['currency'],
+        "exchange": quote['exchange'],
+        "data_points": data_points
+    }
+    print_valid_ticker(result, out=out)
+    
+    if use_cache:
+        file_cache.set(ticker, 'validation', result, cache_params)
+    return result
 
 def try_get_index_components():
     """Attempt to get AEX components directly from Yahoo Finance"""
-    print(f"\n{Fore.BLUE}Attempting to get AEX components directly from Yahoo Finance...{Style.RESET_ALL}")
+    print(f"\n{BLUE}Attempting to get AEX components directly from Yahoo Finance...{RST}")
     try:
         # Get AEX index data
-        aex_index = yf.Ticker(AEX_INDEX_TICKER)
+        aex_index = get_ticker(AEX_INDEX_TICKER)
         
-        # Try to get components (this may not work reliably)
+        # Try to get components (this may not work reliably); the index's .info is
+        # not consulted: it is a heavy quoteSummary request and its dict never
+        # carries a components attribute
         if hasattr(aex_index, 'components'):
             components = list(aex_index.components)
-            print(f"{Fore.GREEN}Successfully retrieved {len(components)} components directly from Yahoo Finance!{Style.RESET_ALL}")
-            return components
-        elif hasattr(aex_index.info, 'components'):
-            components = list(aex_index.info['components'])
-            print(f"{Fore.GREEN}Successfully retrieved {len(components)} components from index info!{Style.RESET_ALL}")
+            print(f"{GREEN}Successfully retrieved {len(components)} components directly from Yahoo Finance!{RST}")
             return components
         else:
-            print(f"{Fore.RED}Could not get components directly - API doesn't provide this data{Style.RESET_ALL}")
+            print(f"{RED}Could not get components directly - API doesn't provide this data{RST}")
             return None
     except Exception as e:
-        print(f"{Fore.RED}Error getting index components: {str(e)}{Style.RESET_ALL}")
+        print(f"{RED}Error getting index components: {str(e)}{RST}")
         return None
 
-def check_all_tickers():
-    """Check and validate all potential AEX tickers"""
+def check_all_tickers(config=RunConfig()):
+    """
+    Check and validate all potential AEX tickers
+
+    Args:
+        config (RunConfig): Settings of the run
+    """
     # First try to get components directly (though this often doesn't work)
     direct_components = try_get_index_components()
     
     # Either use direct components or fall back to our typical list
     tickers_to_check = direct_components or TYPICAL_AEX_TICKERS
     
-    print(f"\n{Fore.BLUE}Checking {len(tickers_to_check)} potential AEX tickers...{Style.RESET_ALL}")
+    print(f"\n{BLUE}Checking {len(tickers_to_check)} potential AEX tickers...{RST}")
     
     results = {
         "valid": [],
@@ -166,12 +310,44 @@ def check_all_tickers():
     # Track all unique valid tickers
     all_valid_tickers = set()
     
-    # Validate each ticker
-    for ticker in tickers_to_check:
-        # Add small delay to avoid rate limiting
-        time.sleep(0.5)
-        
-        result = validate_ticker(ticker)
+    # One batched pass over Yahoo's chart endpoint finds the tickers Yahoo does not
+    # know at all (e.g. delisted ones), which then skip the info requests and retries
+    charts = fetch_charts(tickers_to_check, range="1d")
+    
+    # Validate the tickers concurrently; the requests are network-bound, and the
+    # rate limiter keeps the overall request rate low enough to avoid rate limiting
+    limiter = RateLimiter(config.wait)
+    
+    # Each ticker's output is collected in its own buffer and written in one go,
+    # so the output of concurrent validations does not interleave
+    stdout_lock = threading.Lock()
+    
+    def validate(ticker, out):
+        if config.chart_only:
+            return validate_from_chart(ticker, charts.get(ticker), out=out)
+        if charts.get(ticker) == {}:
+            print(f"\n{CYAN}Checking {ticker}...{RST}", file=out)
+            print(f"{RED}❌ No quote data on Yahoo Finance{RST}", file=out)
+            return {
+                "ticker": ticker,
+                "valid": False,
+                "error": "No quote data on Yahoo Finance"
+            }
+        return validate_ticker(ticker, full_info=config.full_info, use_cache=config.use_cache, out=out, limiter=limiter)
+    
+    def check(ticker):
+        out = io.StringIO()
+        try:
+            return validate(ticker, out)
+        finally:
+            with stdout_lock:
+                sys.stdout.write(out.getvalue())
+                sys.stdout.flush()
+    
+    with ThreadPoolExecutor(max_workers=config.workers) as executor:
+        validation_results = list(executor.map(check, tickers_to_check))
+    
+    for ticker, result in zip(tickers_to_check, validation_results):
         if result["valid"]:
             results["valid"].append(result)
             all_valid_tickers.add(ticker)
@@ -179,20 +355,20 @@ def check_all_tickers():
             results["invalid"].append(result)
     
     # Print summary
-    print(f"\n{Fore.BLUE}===== SUMMARY ====={Style.RESET_ALL}")
+    print(f"\n{BLUE}===== SUMMARY ====={RST}")
     print(f"Found {len(results['valid'])} valid tickers out of {len(tickers_to_check)} checked")
     
     # Print valid tickers
-    print(f"\n{Fore.GREEN}Valid AEX Tickers:{Style.RESET_ALL}")
-    for i, result in enumerate(results['valid'], 1):
-        print(f"{i}. {result['ticker']}: {result['name']} - {result['price']} {result['currency']}")
+    print(f"\n{GREEN}Valid AEX Tickers:{RST}")
+    sys.stdout.writelines(f"{i}. {result['ticker']}: {result['name']} - {result['price']} {result['currency']}\n"
+                          for i, result in enumerate(results['valid'], 1))
     
     # Print invalid tickers
-    print(f"\n{Fore.RED}Invalid or Problematic Tickers:{Style.RESET_ALL}")
-    for i, result in enumerate(results['invalid'], 1):
-        print(f"{i}. {result['ticker']}: {result.get('error', 'Unknown error')}")
+    print(f"\n{RED}Invalid or Problematic Tickers:{RST}")
+    sys.stdout.writelines(f"{i}. {result['ticker']}: {result.get('error', 'Unknown error')}\n"
+                          for i, result in enumerate(results['invalid'], 1))
     
-    print(f"\n{Fore.YELLOW}Recommended JSON configuration:{Style.RESET_ALL}")
+    print(f"\n{YELLOW}Recommended JSON configuration:{RST}")
     print(f"{{")
     print(f'    "AEX_TICKERS": [')
     print(f"        " + ",\n        ".join([f'"{ticker}"' for ticker in all_valid_tickers]))
@@ -200,4 +376,24 @@ def check_all_tickers():
     print(f"}}")
 
 if __name__ == "__main__":
-    check_all_tickers()
+    parser = argparse.ArgumentParser(description="List and validate all AEX tickers using yfinance")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Number of tickers validated concurrently (default: 8)")
+    parser.add_argument("--wait", type=float, default=0.5,
+                        help="Minimum seconds between the start of two ticker validations (default: 0.5)")
+    parser.add_argument("--full-info", action="store_true",
+                        help="Validate with the full (slower) .info data instead of fast_info")
+    parser.add_argument("--chart-only", action="store_true",
+                        help="Validate from one concurrent batch of chart requests only (fastest, no market cap)")
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True,
+                        help="Serve repeated validations from the on-disk cache; --no-cache queries Yahoo Finance again")
+    args = parser.parse_args()
+    
+    config = RunConfig(
+        workers=args.workers,
+        wait=args.wait,
+        full_info=args.full_info,
+        chart_only=args.chart_only,
+        use_cache=args.cache
+    )
+    check_all_tickers(config)
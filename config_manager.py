@@ -7,9 +7,12 @@ It provides a centralized way to manage fair value estimates from different sour
 """
 
 import os
-import json
+import glob
+import gzip
+import orjson
 import logging
 from datetime import datetime
+from file_utils import write_atomic
 
 # Setup logging
 logging.basicConfig(
@@ -25,6 +28,37 @@ logger = logging.getLogger(__name__)
 # Configuration constants
 FAIR_VALUES_CONFIG_FILE = 'fair_values_config.json'
 CONFIG_BACKUP_DIR = 'backups'
+MAX_CONFIG_BACKUPS = 10  # Number of compressed configuration backups kept
+
+# orjson options for the configuration file; DCF fair values are numpy floats,
+# which orjson only serializes with OPT_SERIALIZE_NUMPY
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+def backup_config(content):
+    """
+    Store a gzip-compressed backup of the configuration file content
+    
+    Only the newest MAX_CONFIG_BACKUPS backups are kept; older ones are removed.
+    
+    Args:
+        content (bytes): Raw content of the configuration file
+    
+    Returns:
+        str: Path of the backup file
+    """
+    os.makedirs(CONFIG_BACKUP_DIR, exist_ok=True)
+    backup_file = f"{CONFIG_BACKUP_DIR}/fair_values_config_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz"
+    with gzip.open(backup_file, 'wb') as f:
+        f.write(content)
+    
+    backups = sorted(glob.glob(f"{CONFIG_BACKUP_DIR}/fair_values_config_backup_*.json.gz"),
+                     key=os.path.getmtime, reverse=True)
+    for old_backup in backups[MAX_CONFIG_BACKUPS:]:
+        try:
+            os.remove(old_backup)
+        except OSError as e:
+            logger.warning(f"Could not remove old backup {old_backup}: {str(e)}")
+    return backup_file
 
 def load_fair_values(source=None):
     """
@@ -47,8 +81,8 @@ def load_fair_values(source=None):
         # Try to import from dcf_fair_values.json
         if os.path.exists('dcf_fair_values.json'):
             try:
-                with open('dcf_fair_values.json', 'r') as f:
-                    dcf_data = json.load(f)
+                with open('dcf_fair_values.json', 'rb') as f:
+                    dcf_data = orjson.loads(f.read())
                     if 'values' in dcf_data:
                         config['sources']['dcf'] = dcf_data['values']
                         logger.info("Imported values from dcf_fair_values.json")
@@ -58,8 +92,8 @@ def load_fair_values(source=None):
         # Try to import from fair_values.json (analyst values)
         if os.path.exists('fair_values.json'):
             try:
-                with open('fair_values.json', 'r') as f:
-                    analyst_data = json.load(f)
+                with open('fair_values.json', 'rb') as f:
+                    analyst_data = orjson.loads(f.read())
                     config['sources']['analyst'] = analyst_data
                     logger.info("Imported values from fair_values.json")
             except Exception as e:
@@ -73,26 +107,13 @@ def load_fair_values(source=None):
             return {}
     
     try:
-        with open(FAIR_VALUES_CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+        with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+            config = orjson.loads(f.read())
         
         # Handle source filtering
         if source == 'all' or source is None:
             # Combine all sources based on priority
-            combined_values = {}
-            sources = config.get('sources', {})
-            
-            # Get from all available sources based on priority
-            priority_list = config.get('priority', ['manual', 'dcf', 'analyst'])
-            logger.info(f"Using priority order: {priority_list}")
-            for src in priority_list:
-                if src in sources:
-                    for ticker, value in sources[src].items():
-                        if ticker not in combined_values:  # Only add if not already added from higher priority
-                            combined_values[ticker] = value
-                            logger.debug(f"Using {src} value for {ticker}: {value}")
-            
-            return combined_values
+            return combine_sources(config)
         elif source in config.get('sources', {}):
             return config['sources'][source]
         else:
@@ -103,6 +124,57 @@ def load_fair_values(source=None):
         logger.error(f"Error loading fair values: {str(e)}")
         return {}
 
+def combine_sources(config):
+    """
+    Combine the fair values of all sources based on the configured priority
+    
+    Args:
+        config (dict): Complete configuration dictionary
+    
+    Returns:
+        dict: Dictionary of ticker symbols to fair values
+    """
+    combined_values = {}
+    sources = config.get('sources', {})
+    
+    # Get from all available sources based on priority
+    priority_list = config.get('priority', ['manual', 'dcf', 'analyst'])
+    logger.info(f"Using priority order: {priority_list}")
+    for src in priority_list:
+        if src in sources:
+            for ticker, value in sources[src].items():
+                if ticker not in combined_values:  # Only add if not already added from higher priority
+                    combined_values[ticker] = value
+                    logger.debug(f"Using {src} value for {ticker}: {value}")
+    
+    return combined_values
+
+def load_all_fair_values():
+    """
+    Load the fair values of every source and the combined values with a single read
+    
+    Returns:
+        dict: Maps 'manual', 'dcf', 'analyst' and 'combined' to
+              dictionaries of ticker symbols to fair values
+    """
+    all_values = {'manual': {}, 'dcf': {}, 'analyst': {}, 'combined': {}}
+    
+    # Let load_fair_values() handle first-time initialization of the config file
+    if not os.path.exists(FAIR_VALUES_CONFIG_FILE):
+        load_fair_values(source='manual')
+    
+    try:
+        with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+            config = orjson.loads(f.read())
+        
+        for src, values in config.get('sources', {}).items():
+            all_values[src] = values
+        all_values['combined'] = combine_sources(config)
+    except Exception as e:
+        logger.error(f"Error loading fair values: {str(e)}")
+    
+    return all_values
+
 def save_fair_values(values, source='manual'):
     """
     Save fair values to configuration file
@@ -115,20 +187,16 @@ def save_fair_values(values, source='manual'):
         bool: True if successful, False otherwise
     """
     try:
-        # Create backup directory if it doesn't exist
-        os.makedirs(CONFIG_BACKUP_DIR, exist_ok=True)
-        
         # Load existing configuration if available
         config = {}
         if os.path.exists(FAIR_VALUES_CONFIG_FILE):
             try:
-                with open(FAIR_VALUES_CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
+                with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+                    content = f.read()
+                config = orjson.loads(content)
                 
-                # Create a backup before modifying
-                backup_file = f"{CONFIG_BACKUP_DIR}/fair_values_config_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(backup_file, 'w') as f:
-                    json.dump(config, f, indent=4)
+                # Create a backup of the file as it is before modifying
+                backup_file = backup_config(content)
                 logger.info(f"Created backup at {backup_file}")
             except Exception as e:
                 logger.warning(f"Could not create backup: {str(e)}")
@@ -151,8 +219,7 @@ def save_fair_values(values, source='manual'):
         }
         
         # Save the updated configuration
-        with open(FAIR_VALUES_CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        write_atomic(FAIR_VALUES_CONFIG_FILE, orjson.dumps(config, option=JSON_OPTIONS))
         
         logger.info(f"Saved {len(values)} fair values from source '{source}'")
         return True
@@ -171,8 +238,7 @@ def save_config(config):
         bool: True if successful, False otherwise
     """
     try:
-        with open(FAIR_VALUES_CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        write_atomic(FAIR_VALUES_CONFIG_FILE, orjson.dumps(config, option=JSON_OPTIONS))
         return True
     except Exception as e:
         logger.error(f"Error saving configuration: {str(e)}")
@@ -187,8 +253,8 @@ def get_source_priority():
     """
     try:
         if os.path.exists(FAIR_VALUES_CONFIG_FILE):
-            with open(FAIR_VALUES_CONFIG_FILE, 'r') as f:
-                config = json.load(f)
+            with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+                config = orjson.loads(f.read())
             return config.get('priority', ['manual', 'dcf', 'analyst'])
         return ['manual', 'dcf', 'analyst']  # Default priority
     except Exception as e:
@@ -211,13 +277,12 @@ def set_source_priority(priority_list):
             return False
         
         if os.path.exists(FAIR_VALUES_CONFIG_FILE):
-            with open(FAIR_VALUES_CONFIG_FILE, 'r') as f:
-                config = json.load(f)
+            with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+                config = orjson.loads(f.read())
             
             config['priority'] = priority_list
             
-            with open(FAIR_VALUES_CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=4)
+            write_atomic(FAIR_VALUES_CONFIG_FILE, orjson.dumps(config, option=JSON_OPTIONS))
             
             logger.info(f"Updated source priority: {priority_list}")
             return True
@@ -245,34 +310,29 @@ def initialize_from_scanner_py():
         with open(scanner_file, 'r') as f:
             content = f.read()
         
-        # Find the FAIR_VALUE_ESTIMATES dictionary using regex
-        import re
-        pattern = r"FAIR_VALUE_ESTIMATES\s*=\s*{([^}]*)}"
-        match = re.search(pattern, content, re.DOTALL)
+        # Locate the FAIR_VALUE_ESTIMATES dictionary literal via the AST, which
+        # is not confused by braces inside strings or comments
+        import ast
+        fair_values = None
+        for node in ast.walk(ast.parse(content)):
+            if (isinstance(node, ast.Assign)
+                    and any(isinstance(t, ast.Name) and t.id == 'FAIR_VALUE_ESTIMATES' for t in node.targets)
+                    and isinstance(node.value, ast.Dict)):
+                try:
+                    fair_values = ast.literal_eval(node.value)
+                except ValueError as e:
+                    logger.warning(f"Could not parse FAIR_VALUE_ESTIMATES literal: {str(e)}")
+                break
         
-        if not match:
+        if fair_values is None:
             logger.error(f"Could not find FAIR_VALUE_ESTIMATES in {scanner_file}")
             return False
-            
-        # Extract the dictionary content and parse it
-        dict_content = match.group(1)
-        fair_values = {}
         
-        # Parse each line of the dictionary
-        for line in dict_content.strip().split('\n'):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            # Extract key and value using regex
-            kv_match = re.match(r"'([^']+)':\s*([\d\.e+-]+),?", line)
-            if kv_match:
-                key = kv_match.group(1)
-                try:
-                    value = float(kv_match.group(2))
-                    fair_values[key] = value
-                except ValueError:
-                    logger.warning(f"Could not parse value for key {key}: {kv_match.group(2)}")
+        # Keep only numeric values
+        fair_values = {
+            key: float(value) for key, value in fair_values.items()
+            if isinstance(key, str) and isinstance(value, (int, float))
+        }
         
         if fair_values:
             # Save as manual source (highest priority)
@@ -325,8 +385,8 @@ if __name__ == "__main__":
     if args.show or (not args.init and not args.set_priority):
         try:
             if os.path.exists(FAIR_VALUES_CONFIG_FILE):
-                with open(FAIR_VALUES_CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
+                with open(FAIR_VALUES_CONFIG_FILE, 'rb') as f:
+                    config = orjson.loads(f.read())
                 
                 print("\nAEX DCF Scanner Configuration")
                 print("============================\n")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+AEX Data Cache - Persistent on-disk cache for Yahoo Finance results
+
+Repeated runs (e.g. during development) are served from pickles stored under
+cache/yfinance/<ticker>/ instead of hitting Yahoo Finance again. Entries
+expire based on file modification time.
+
+Usage:
+    from data_cache import get_info, get_history, get_cashflow
+
+    stock = yf.Ticker("ASML.AS")
+    info = get_info(stock)                     # cached for 24 hours
+    hist = get_history(stock, period="1mo")    # cached for 24 hours
+    cashflow = get_cashflow(stock)             # cached for 7 days
+
+    python data_cache.py --clear               # Remove all cached entries
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import logging
+import shutil
+import tempfile
+import functools
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache', 'yfinance')
+INFO_TTL = 24 * 60 * 60          # 24 hours in seconds
+HISTORY_TTL = 24 * 60 * 60       # 24 hours in seconds
+CASHFLOW_TTL = 7 * 24 * 60 * 60  # 7 days in seconds
+
+def _is_empty(value):
+    """Return True for results that should not be cached (None, empty dict/DataFrame)"""
+    if value is None:
+        return True
+    if hasattr(value, 'empty'):
+        return value.empty
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
+
+class FileCache:
+    """
+    File-based cache keyed by (ticker, endpoint, params)
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        """Initialize the cache rooted at cache_dir"""
+        self.cache_dir = cache_dir
+
+    def _path(self, ticker, endpoint, params):
+        """Build the pickle path for a cache key"""
+        params_hash = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+        safe_ticker = ticker.replace(os.sep, '_')
+        return os.path.join(self.cache_dir, safe_ticker, f"{endpoint}_{params_hash}.pkl")
+
+    def get(self, ticker, endpoint, params=None, ttl=INFO_TTL):
+        """
+        Look up a cached value
+
+        Returns:
+            tuple: (hit, value) where hit is False if missing or expired
+        """
+        path = self._path(ticker, endpoint, params or {})
+        try:
+            if time.time() - os.path.getmtime(path) >= ttl:
+                logger.debug(f"Cache expired for {ticker} {endpoint}")
+                return False, None
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            logger.debug(f"Cache hit for {ticker} {endpoint}")
+            return True, value
+        except FileNotFoundError:
+            logger.debug(f"Cache miss for {ticker} {endpoint}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+        return False, None
+
+    def set(self, ticker, endpoint, value, params=None):
+        """Store a value in the cache"""
+        path = self._path(ticker, endpoint, params or {})
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a uniquely named temporary file and swap it in, so concurrent
+            # writers (threads or processes) never share a temporary file and
+            # readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {path}: {str(e)}")
+
+    def clear(self):
+        """Remove all cached entries"""
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+            logger.info(f"Cleared cache at {self.cache_dir}")
+
+# Shared cache instance
+file_cache = FileCache()
+
+def cached(endpoint, ttl=INFO_TTL, cache=file_cache, valid=None):
+    """
+    Decorator caching the result of func(stock, **params) per ticker
+
+    The decorated function must take a yf.Ticker as its first argument;
+    keyword arguments become part of the cache key. Empty results, and
+    results rejected by the optional valid predicate, are neither cached
+    nor served from the cache, so a transient failure is retried instead
+    of being replayed.
+
+    Args:
+        endpoint (str): Name of the cached endpoint, e.g. 'info'
+        ttl (int): Time-to-live in seconds
+        cache (FileCache): Cache to store entries in
+        valid (callable): Optional predicate a non-empty result must also pass,
+                          e.g. a minimum number of fields
+    """
+    def usable(value):
+        return not _is_empty(value) and (valid is None or valid(value))
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(stock, **params):
+            hit, value = cache.get(stock.ticker, endpoint, params, ttl)
+            if hit and usable(value):
+                return value
+            value = func(stock, **params)
+            if usable(value):
+                cache.set(stock.ticker, endpoint, value, params)
+            return value
+        return wrapper
+    return decorator
+
+@cached('info', ttl=INFO_TTL)
+def get_info(stock):
+    """Return stock.info, served from the cache when fresh"""
+    return stock.info
+
+@cached('history', ttl=HISTORY_TTL)
+def get_history(stock, **params):
+    """Return stock.history(**params), served from the cache when fresh"""
+    return stock.history(**params)
+
+@cached('cashflow', ttl=CASHFLOW_TTL)
+def get_cashflow(stock):
+    """Return stock.cashflow, served from the cache when fresh"""
+    return stock.cashflow
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AEX Data Cache - manage cached Yahoo Finance results")
+    parser.add_argument('--clear', action='store_true', help='Remove all cached entries')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.clear:
+        file_cache.clear()
+    else:
+        parser.print_help()
@@ -4,11 +4,12 @@ AEX DCF Integration - Integrates DCF calculations with the AEX scanner
 """
 
 import os
-import json
+import orjson
 import logging
 import sys
 from datetime import datetime
 from aex_tickers import AEX_TICKERS
+from file_utils import write_atomic
 
 # Setup logging
 logging.basicConfig(
@@ -42,11 +43,11 @@ def update_fair_values_with_dcf():
         # Save to DCF-specific JSON file for backward compatibility
         dcf_file = 'dcf_fair_values.json'
         try:
-            with open(dcf_file, 'w') as f:
-                json.dump({
-                    'values': dcf_values,
-                    'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }, f, indent=4)
+            # DCF fair values are numpy floats, which orjson only serializes with OPT_SERIALIZE_NUMPY
+            write_atomic(dcf_file, orjson.dumps({
+                'values': dcf_values,
+                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
             logger.info(f"Saved {len(dcf_values)} DCF fair values to {dcf_file}")
         except Exception as e:
             logger.error(f"Error saving DCF fair values to legacy file: {str(e)}")
@@ -66,26 +67,6 @@ def update_fair_values_with_dcf():
         logger.error(f"Error updating fair values with DCF: {str(e)}")
         return False
 
-def update_scanner_file(fair_values):
-    """
-    Legacy method to update the FAIR_VALUE_ESTIMATES dictionary in aex_scanner.py
-    Now redirects to the configuration system
-    
-    Args:
-        fair_values (dict): Dictionary of ticker symbols to fair values
-        
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    logger.info("update_scanner_file() is deprecated. Using configuration system instead.")
-    
-    try:
-        from config_manager import save_fair_values
-        return save_fair_values(fair_values, source='dcf')
-    except Exception as e:
-        logger.error(f"Error updating fair values: {str(e)}")
-        return False
-
 def generate_dcf_report():
     """
     Generate a detailed DCF analysis report for AEX stocks
@@ -125,7 +106,7 @@ if __name__ == "__main__":
         if report_path and success:
             print("\n✅ DCF Model Implementation Successful!")
             print(f"- DCF report saved to: {report_path}")
-            print("- Fair values updated in aex_scanner.py")
+            print("- Fair values updated in configuration")
             print("\nYou can now run the scanner to use the DCF fair values:")
             print("python aex_scanner.py")
         else:
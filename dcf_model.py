@@ -18,7 +18,7 @@ import time
 import random
 import os
 import sys
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
+from http_session import get_session, TRANSIENT_ERRORS
 from datetime import datetime
 
 # Setup logging
@@ -69,7 +69,7 @@ class DCFModel:
         retries = 0
         while retries <= self.default_params['max_retries']:
             try:
-                stock = yf.Ticker(ticker_symbol)
+                stock = yf.Ticker(ticker_symbol, session=get_session())
                 info = stock.info
                 
                 # Check if response seems valid
@@ -85,7 +85,7 @@ class DCFModel:
                 
                 return stock
                 
-            except (ConnectionError, Timeout, HTTPError) as e:
+            except TRANSIENT_ERRORS as e:
                 if retries < self.default_params['max_retries']:
                     retries += 1
                     wait_time = self.default_params['retry_delay'] * (2 ** retries) * (1 + random.random())
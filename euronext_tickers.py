@@ -1,96 +1,198 @@
+#!/usr/bin/env python3
+"""
+Euronext AEX Tickers - Scrapes the AEX composition from the Euronext website
+
+Writes amsterdam_aex_tickers.csv (primary source of truth for tickers) and
+refreshes the tickers.json backup via the aex_tickers module.
+"""
+
 import time
-import json
+import orjson
 import os
+import sys
 import pandas as pd
-from io import StringIO
+import lxml.html
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-# Setup headless Chrome
-options = Options()
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-driver = webdriver.Chrome(options=options)
-
-# Open Euronext AEX composition page
-url = "https://live.euronext.com/en/popout-page/getIndexComposition/NL0000000107-XAMS"
-driver.get(url)
-
-# Wait until the table element is present
-try:
-    WebDriverWait(driver, 15).until(
-        EC.presence_of_element_located((By.TAG_NAME, "table"))
-    )
-except Exception as e:
-    print("Error waiting for table to load:", e)
-    driver.quit()
-    exit(1)
-
-# Get page source after JS rendering
-html = driver.page_source
-
-# Close the browser
-driver.quit()
-
-# Use pandas to parse HTML tables
-tables = pd.read_html(StringIO(html))
-df = tables[0]
+# Cache for the rendered Euronext pages; AEX composition changes rarely
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
+CACHE_TTL = 24 * 60 * 60  # 24 hours in seconds
+COMPOSITION_CACHE_FILE = os.path.join(CACHE_DIR, "aex_composition.html")
+SYMBOLS_CACHE_FILE = os.path.join(CACHE_DIR, "euronext_symbols.json")
+
+# Euronext AEX composition page
+COMPOSITION_URL = "https://live.euronext.com/en/popout-page/getIndexComposition/NL0000000107-XAMS"
+
+# Base URL for Euronext equity product pages (followed by "<ISIN>-XAMS")
+EQUITIES_URL_PREFIX = "https://live.euronext.com/en/product/equities/"
+
+def is_cache_fresh(path, ttl=CACHE_TTL):
+    """Return True if the cache file exists and is younger than ttl seconds"""
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl
+
+def create_chrome_options():
+    """Build the headless Chrome options used for scraping"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # Return from driver.get() once the DOM is interactive; the explicit waits below
+    # cover the JS-rendered elements we need, so sub-resources need not finish loading
+    options.page_load_strategy = "eager"
+    return options
+
+def parse_composition_table(html):
+    """
+    Parse the AEX composition table into a DataFrame
+
+    Args:
+        html (str): Rendered HTML of the composition page
+
+    Returns:
+        pd.DataFrame: One row per component with snake_case column names
+    """
+    # Parse the composition table directly with lxml (the table layout is known,
+    # so there is no need for pandas' read_html column inference)
+    root = lxml.html.fromstring(html)
+    table = root.xpath("//table")[0]
+
+    # Clean up column names
+    columns = [th.text_content().strip().lower().replace(" ", "_") for th in table.xpath(".//th")]
+    rows = [
+        [td.text_content().strip() for td in tr.xpath("./td")]
+        for tr in table.xpath(".//tr")
+    ]
+    # Header rows have no <td> cells; any other row must match the columns
+    rows = [row for row in rows if row]
+    matching = [row for row in rows if len(row) == len(columns)]
+    if len(matching) < len(rows):
+        print(f"⚠️ Skipped {len(rows) - len(matching)} composition table rows "
+              f"whose cell count does not match the {len(columns)} columns")
+    return pd.DataFrame(matching, columns=columns)
+
+def main():
+    """
+    Scrape the AEX composition and ticker symbols and save them
+
+    Returns:
+        pd.DataFrame: The scraped components, or None if the page could not be loaded
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # The browser is only started if something has to be fetched
+    driver = None
+
+    def get_driver():
+        nonlocal driver
+        if driver is None:
+            driver = webdriver.Chrome(options=create_chrome_options())
+        return driver
 
-# Clean up column names
-df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
-
-# Generate correct Euronext component links using ISINs
-df['component_link'] = df['isin'].apply(lambda isin: f"https://live.euronext.com/en/product/equities/{isin}-XAMS")
-
-# Setup browser again for scraping symbols from the /ipo page using JSON inside script tag
-driver = webdriver.Chrome(options=options)
-tickers = []
-
-for isin in df['isin']:
     try:
-        ipo_url = f"https://live.euronext.com/en/product/equities/{isin}-XAMS/ipo"
-        driver.get(ipo_url)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "script[data-drupal-selector='drupal-settings-json']"))
-        )
-        script_tag = driver.find_element(By.CSS_SELECTOR, "script[data-drupal-selector='drupal-settings-json']")
-        json_data = json.loads(script_tag.get_attribute("innerHTML"))
-        symbol = json_data.get("custom", {}).get("instrument", {}).get("symbol", None)
-        tickers.append(symbol)
+        if is_cache_fresh(COMPOSITION_CACHE_FILE):
+            print(f"Using cached AEX composition from {COMPOSITION_CACHE_FILE}")
+            with open(COMPOSITION_CACHE_FILE, "r", encoding="utf-8") as f:
+                html = f.read()
+        else:
+            # Open Euronext AEX composition page
+            get_driver().get(COMPOSITION_URL)
+
+            # Wait until the table element is present
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "table"))
+                )
+            except Exception as e:
+                print("Error waiting for table to load:", e)
+                return None
+
+            # Get page source after JS rendering
+            html = driver.page_source
+            with open(COMPOSITION_CACHE_FILE, "w", encoding="utf-8") as f:
+                f.write(html)
+
+        df = parse_composition_table(html)
+
+        # Generate correct Euronext component links using ISINs
+        df['component_link'] = EQUITIES_URL_PREFIX + df['isin'] + "-XAMS"
+
+        # Load previously scraped ISIN -> symbol mappings
+        symbol_cache = {}
+        if is_cache_fresh(SYMBOLS_CACHE_FILE):
+            try:
+                with open(SYMBOLS_CACHE_FILE, "rb") as f:
+                    symbol_cache = orjson.loads(f.read())
+            except Exception as e:
+                print(f"Ignoring unreadable symbol cache {SYMBOLS_CACHE_FILE}: {e}")
+
+        # Reuse the same browser session (and its open connections to live.euronext.com)
+        # for scraping symbols from the /ipo page using JSON inside script tag
+        tickers = []
+
+        for isin in df['isin']:
+            if symbol_cache.get(isin):
+                tickers.append(symbol_cache[isin])
+                continue
+            try:
+                ipo_url = f"{EQUITIES_URL_PREFIX}{isin}-XAMS/ipo"
+                get_driver().get(ipo_url)
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "script[data-drupal-selector='drupal-settings-json']"))
+                )
+                # Parse the page source in-process instead of querying the element
+                # over the WebDriver protocol
+                page = lxml.html.fromstring(driver.page_source)
+                raw = page.xpath("//script[@data-drupal-selector='drupal-settings-json']/text()")[0]
+                json_data = orjson.loads(raw)
+                symbol = json_data.get("custom", {}).get("instrument", {}).get("symbol", None)
+                tickers.append(symbol)
+                if symbol:
+                    symbol_cache[isin] = symbol
+            except Exception as e:
+                print(f"Error fetching symbol for {isin}: {e}")
+                tickers.append(None)
+
+        if driver is not None:
+            with open(SYMBOLS_CACHE_FILE, "wb") as f:
+                f.write(orjson.dumps(symbol_cache, option=orjson.OPT_INDENT_2))
+    finally:
+        if driver is not None:
+            driver.quit()
+
+    # Add ticker symbols to DataFrame
+    df['euronext_ticker'] = tickers
+
+    # Map to Yahoo Finance ticker format (append .AS)
+    # (missing symbols stay missing: string concatenation propagates NaN/None)
+    df['yahoo_ticker'] = df['euronext_ticker'] + ".AS"
+
+    # Print cleaned output
+    print(df[['component', 'isin', 'euronext_ticker', 'yahoo_ticker']])
+
+    # Save to CSV as the primary source of truth
+    csv_path = os.path.join(os.path.dirname(__file__), "amsterdam_aex_tickers.csv")
+    df[['component', 'isin', 'euronext_ticker', 'yahoo_ticker']].to_csv(csv_path, index=False)
+    print(f"✅ Saved {len(df)} tickers to {csv_path}")
+
+    # Update tickers.json backup file via the aex_tickers module
+    try:
+        from aex_tickers import update_json_from_csv
+        yahoo_tickers = list(df['yahoo_ticker'].dropna().values)
+        json_path = os.path.join(os.path.dirname(__file__), "tickers.json")
+        if update_json_from_csv(yahoo_tickers, json_path):
+            print(f"✅ Updated backup in {json_path} with {len(yahoo_tickers)} tickers")
+        else:
+            print(f"❌ Failed to update JSON backup")
     except Exception as e:
-        print(f"Error fetching symbol for {isin}: {e}")
-        tickers.append(None)
-
-driver.quit()
-
-# Add ticker symbols to DataFrame
-df['euronext_ticker'] = tickers
-
-# Map to Yahoo Finance ticker format (append .AS)
-df['yahoo_ticker'] = df['euronext_ticker'].apply(lambda x: f"{x}.AS" if pd.notna(x) else None)
-
-# Print cleaned output
-print(df[['component', 'isin', 'euronext_ticker', 'yahoo_ticker']])
-
-# Save to CSV as the primary source of truth
-csv_path = os.path.join(os.path.dirname(__file__), "amsterdam_aex_tickers.csv")
-df[['component', 'isin', 'euronext_ticker', 'yahoo_ticker']].to_csv(csv_path, index=False)
-print(f"✅ Saved {len(df)} tickers to {csv_path}")
-
-# Update tickers.json backup file via the aex_tickers module
-try:
-    from aex_tickers import load_tickers, update_json_from_csv
-    tickers = list(df['yahoo_ticker'].dropna().values)
-    json_path = os.path.join(os.path.dirname(__file__), "tickers.json")
-    if update_json_from_csv(tickers, json_path):
-        print(f"✅ Updated backup in {json_path} with {len(tickers)} tickers")
-    else:
-        print(f"❌ Failed to update JSON backup")
-except Exception as e:
-    print(f"❌ Error updating JSON backup: {str(e)}")
-    
-print("\nSuggestion: Run 'aex_scanner.py' to test the tickers with the latest data")
+        print(f"❌ Error updating JSON backup: {str(e)}")
+
+    print("\nSuggestion: Run 'aex_scanner.py' to test the tickers with the latest data")
+    return df
+
+if __name__ == "__main__":
+    if main() is None:
+        sys.exit(1)
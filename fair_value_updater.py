@@ -5,12 +5,15 @@ AEX Fair Value Updater - Fetches analyst target prices to update fair value esti
 
 import yfinance as yf
 import pandas as pd
-import json
+import orjson
 import os
 import logging
-import time
-import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from tenacity import (
+    retry, stop_after_attempt, wait_exponential_jitter,
+    retry_if_exception_type, before_sleep_log
+)
 
 # Setup logging
 logging.basicConfig(
@@ -25,6 +28,88 @@ logger = logging.getLogger(__name__)
 
 # Import AEX stock tickers from central module
 from aex_tickers import AEX_TICKERS
+from http_session import get_session, TRANSIENT_ERRORS
+from file_utils import write_atomic
+
+# Retry configuration
+MAX_RETRIES = 3
+RETRY_DELAY = 2  # in seconds
+
+# Number of tickers fetched concurrently
+MAX_WORKERS = 8
+
+@retry(
+    retry=retry_if_exception_type(TRANSIENT_ERRORS),
+    stop=stop_after_attempt(MAX_RETRIES + 1),
+    wait=wait_exponential_jitter(initial=RETRY_DELAY * 2, jitter=RETRY_DELAY),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+def fetch_ticker_info(stock):
+    """
+    Fetch the info dict for a yfinance Ticker, retrying only on network errors
+    
+    Args:
+        stock (yf.Ticker): The ticker object to fetch info for
+        
+    Returns:
+        dict: The ticker info
+    """
+    return stock.info
+
+def filter_live_tickers(tickers, session=None):
+    """
+    Drop tickers without recent prices (delisted/merged) using one batched download
+    
+    Args:
+        tickers (list): Ticker symbols to probe
+        session: Optional HTTP session shared with the other yfinance calls
+        
+    Returns:
+        list: Tickers that have at least one recent close; all tickers if the probe fails
+    """
+    try:
+        probe = yf.download(tickers, period="5d", progress=False, threads=True, session=session)['Close']
+    except Exception as e:
+        logger.warning("Could not probe tickers for recent prices, keeping all: %s", e)
+        return tickers
+    
+    if isinstance(probe, pd.Series):
+        probe = probe.to_frame(name=tickers[0])
+    
+    alive = [t for t in tickers if t in probe.columns and not probe[t].isna().all()]
+    if not alive:
+        # An empty probe is more likely a rate limit than a fully delisted index
+        logger.warning("Price probe returned no data, keeping all tickers")
+        return tickers
+    
+    skipped = [t for t in tickers if t not in alive]
+    if skipped:
+        logger.warning("Skipping %s tickers without recent prices: %s", len(skipped), ", ".join(skipped))
+    return alive
+
+def fetch_all_ticker_info(tickers_obj, tickers):
+    """
+    Fetch info dicts for all tickers concurrently
+    
+    Args:
+        tickers_obj (yf.Tickers): Batch ticker object holding every symbol
+        tickers (list): Ticker symbols to fetch
+        
+    Returns:
+        dict: Ticker symbol to info dict, or None if the fetch failed
+    """
+    def fetch(ticker):
+        try:
+            return fetch_ticker_info(tickers_obj.tickers[ticker])
+        except TRANSIENT_ERRORS as e:
+            logger.error("Failed to update %s after %s retries: %s", ticker, MAX_RETRIES, e)
+        except Exception as e:
+            logger.error("Error fetching data for %s: %s", ticker, e)
+        return None
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return dict(zip(tickers, executor.map(fetch, tickers)))
 
 def update_fair_values():
     """
@@ -45,17 +130,17 @@ def update_fair_values():
     try:
         # Load analyst values specifically, or initialize empty
         fair_values = load_fair_values(source='analyst') or {}
-        logger.info(f"Loaded existing fair values for {len(fair_values)} stocks from configuration")
+        logger.info("Loaded existing fair values for %s stocks from configuration", len(fair_values))
     except Exception as e:
-        logger.error(f"Error loading fair values from configuration: {str(e)}")
+        logger.error("Error loading fair values from configuration: %s", e)
         # Fall back to legacy file
         if os.path.exists(fair_values_file):
             try:
-                with open(fair_values_file, 'r') as f:
-                    fair_values = json.load(f)
-                    logger.info(f"Loaded existing fair values from legacy file for {len(fair_values)} stocks")
+                with open(fair_values_file, 'rb') as f:
+                    fair_values = orjson.loads(f.read())
+                    logger.info("Loaded existing fair values from legacy file for %s stocks", len(fair_values))
             except Exception as e:
-                logger.error(f"Error loading legacy fair values: {str(e)}")
+                logger.error("Error loading legacy fair values: %s", e)
                 fair_values = {}
         else:
             fair_values = {}
@@ -63,57 +148,52 @@ def update_fair_values():
     # Create a DataFrame to store results
     results = []
     
-    # Add retry configuration
-    max_retries = 3
-    retry_delay = 2  # in seconds
+    # One HTTP session for the whole run so every Yahoo request reuses the same
+    # keep-alive connections
+    session = get_session()
     
-    for ticker in AEX_TICKERS:
-        retries = 0
-        while retries <= max_retries:
-            try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                
-                # Get analyst target price
-                target_price = info.get('targetMeanPrice')
-                current_price = info.get('currentPrice')
-                name = info.get('shortName', ticker)
-                
-                # Validate data completeness
-                if not target_price or not current_price:
-                    logger.warning(f"No target price or current price available for {ticker}")
-                    break
-                
-                # Calculate premium/discount
-                premium_discount = ((target_price / current_price) - 1) * 100
-                
-                # Get existing fair value if available
-                existing_fair_value = fair_values.get(ticker, None)
-                
-                # Update fair value
-                fair_values[ticker] = target_price
-                
-                results.append({
-                    'Ticker': ticker,
-                    'Name': name,
-                    'Current Price': current_price,
-                    'Analyst Target': target_price,
-                    'Previous Fair Value': existing_fair_value,
-                    'Premium/Discount %': premium_discount
-                })
-                
-                logger.info(f"Updated {ticker}: Target Price = {target_price}")
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                if retries < max_retries:
-                    retries += 1
-                    wait_time = retry_delay * (2 ** retries) * (1 + random.random())
-                    logger.warning(f"Error fetching data for {ticker}, retrying in {wait_time:.2f} seconds: {str(e)}")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to update {ticker} after {max_retries} retries: {str(e)}")
-                    break
+    # Skip stale/delisted tickers before the expensive per-ticker lookups
+    tickers = filter_live_tickers(AEX_TICKERS, session=session)
+    
+    # Build all Ticker objects in one go so they share the session
+    tickers_obj = yf.Tickers(" ".join(tickers), session=session)
+    
+    infos = fetch_all_ticker_info(tickers_obj, tickers)
+    
+    for ticker in tickers:
+        info = infos[ticker]
+        if info is None:
+            continue
+        
+        # Get analyst target price
+        target_price = info.get('targetMeanPrice')
+        current_price = info.get('currentPrice')
+        name = info.get('shortName', ticker)
+        
+        # Validate data completeness (missing data is not retried)
+        if not target_price or not current_price:
+            logger.warning("No target price or current price available for %s", ticker)
+            continue
+        
+        # Calculate premium/discount
+        premium_discount = ((target_price / current_price) - 1) * 100
+        
+        # Get existing fair value if available
+        existing_fair_value = fair_values.get(ticker, None)
+        
+        # Update fair value
+        fair_values[ticker] = target_price
+        
+        results.append({
+            'Ticker': ticker,
+            'Name': name,
+            'Current Price': current_price,
+            'Analyst Target': target_price,
+            'Previous Fair Value': existing_fair_value,
+            'Premium/Discount %': premium_discount
+        })
+        
+        logger.info("Updated %s: Target Price = %s", ticker, target_price)
     
     # Save updated fair values to both the configuration system and legacy file
     from config_manager import save_fair_values
@@ -121,17 +201,26 @@ def update_fair_values():
     # Save to configuration system
     try:
         save_fair_values(fair_values, source='analyst')
-        logger.info(f"Saved updated fair values to configuration")
+        logger.info("Saved updated fair values to configuration")
     except Exception as e:
-        logger.error(f"Error saving fair values to configuration: {str(e)}")
+        logger.error("Error saving fair values to configuration: %s", e)
     
     # Save to legacy file for backward compatibility
     try:
-        with open(fair_values_file, 'w') as f:
-            json.dump(fair_values, f, indent=4)
-        logger.info(f"Saved updated fair values to legacy file {fair_values_file}")
+        new_content = orjson.dumps(fair_values, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        old_content = b""
+        if os.path.exists(fair_values_file):
+            with open(fair_values_file, 'rb') as f:
+                old_content = f.read()
+        
+        if new_content == old_content:
+            logger.info("Legacy file %s is already up to date", fair_values_file)
+        else:
+            # Write to a temporary file and swap it in so a crash never leaves a partial file
+            write_atomic(fair_values_file, new_content)
+            logger.info("Saved updated fair values to legacy file %s", fair_values_file)
     except Exception as e:
-        logger.error(f"Error saving fair values to legacy file: {str(e)}")
+        logger.error("Error saving fair values to legacy file: %s", e)
     
     # Create DataFrame and save to Excel
     if results:
@@ -139,31 +228,18 @@ def update_fair_values():
         excel_file_name = f"fair_value_updates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         excel_file_path = os.path.join(output_dir, excel_file_name)
         
-        df.to_excel(excel_file_path, index=False)
-        logger.info(f"Saved update report to {excel_file_path}")
+        # xlsxwriter streams cells straight to the file without building an openpyxl workbook
+        with pd.ExcelWriter(excel_file_path, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False)
+        logger.info("Saved update report to %s", excel_file_path)
         
         return fair_values, excel_file_path
     else:
         logger.warning("No updates were made")
         return fair_values, None
 
-def update_scanner_file(fair_values):
-    """
-    Legacy method to update the fair value estimates in the aex_scanner.py file
-    Now redirects to the configuration system
-    """
-    logger.info("update_scanner_file() is deprecated. Using configuration system instead.")
-    
-    try:
-        from config_manager import save_fair_values
-        return save_fair_values(fair_values, source='analyst')
-    except Exception as e:
-        logger.error(f"Error updating fair values: {str(e)}")
-        return False
-
 if __name__ == "__main__":
     fair_values, report_file = update_fair_values()
-    update_scanner_file(fair_values)
     
     if report_file:
         print(f"Fair values updated successfully! Report saved to {report_file}")
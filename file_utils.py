@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+AEX File Utilities - Crash-safe writes for the scanner's JSON files
+
+Usage:
+    from file_utils import write_atomic
+
+    write_atomic("tickers.json", orjson.dumps(data, option=orjson.OPT_INDENT_2))
+"""
+
+import os
+import tempfile
+
+def write_atomic(path, content):
+    """
+    Write bytes to a file atomically
+
+    The content goes to a uniquely named temporary file in the same directory,
+    is flushed to disk and then swapped in. Concurrent writers never share a
+    temporary file, and a crash never leaves a truncated or empty file behind.
+    The file keeps its permissions if it already exists.
+
+    Args:
+        path (str): File to write
+        content (bytes): New content of the file
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file readable by its owner only
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+AEX HTTP Session - Shared HTTP session for all Yahoo Finance requests
+
+Passing the same session to every yf.Ticker / yf.Tickers / yf.download call
+lets all requests reuse warm keep-alive connections instead of paying a new
+TCP/TLS handshake per ticker. Recent yfinance versions only accept curl_cffi
+sessions, which also keep one curl handle per thread so the session can be
+shared with thread pools. HTTPS requests use HTTP/2, so concurrent requests
+from one thread's handle are multiplexed over a single connection.
+
+Usage:
+    from http_session import get_session
+
+    stock = yf.Ticker("ASML.AS", session=get_session())
+"""
+
+import random
+import threading
+from curl_cffi import requests as curl_requests
+from curl_cffi.const import CurlHttpVersion
+from curl_cffi.requests.exceptions import RequestException as CurlRequestException
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout, HTTPError
+
+# Browser profile impersonated by the session
+IMPERSONATE = "chrome"
+
+# HTTP/2 for HTTPS (falls back to HTTP/1.1 if the server does not offer it)
+HTTP_VERSION = CurlHttpVersion.V2TLS
+
+# Errors worth retrying: request errors of curl_cffi (used by yfinance) and of
+# requests, plus the builtin connection and timeout errors. A bare OSError is
+# deliberately not included, as it would also retry local errors such as
+# FileNotFoundError and PermissionError.
+TRANSIENT_ERRORS = (CurlRequestException, RequestsConnectionError, Timeout, HTTPError, ConnectionError, TimeoutError)
+
+# Retry delays in seconds: start (and minimum) of the decorrelated jitter, and the
+# cap on any single delay, including one requested through Retry-After
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60
+
+# HTTP status codes for which retrying cannot help (e.g. 404 for delisted tickers)
+NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404})
+
+_session = None
+_session_lock = threading.Lock()
+
+def next_backoff(previous, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Return the next retry delay using decorrelated jitter: uniform(base, 3 * previous), capped"""
+    return min(cap, random.uniform(base, previous * 3))
+
+def http_status(error):
+    """Return the HTTP status code attached to a request error, or None"""
+    return getattr(getattr(error, 'response', None), 'status_code', None)
+
+def retry_after(error):
+    """Return the Retry-After delay in seconds sent with a 429 response, clamped to RETRY_MAX_DELAY, or None"""
+    if http_status(error) != 429:
+        return None
+    try:
+        delay = float(error.response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+    return min(RETRY_MAX_DELAY, max(0, delay))
+
+def get_session():
+    """
+    Return the process-wide HTTP session, creating it on first use
+
+    Returns:
+        curl_cffi.requests.Session: The shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = curl_requests.Session(impersonate=IMPERSONATE, http_version=HTTP_VERSION)
+        return _session
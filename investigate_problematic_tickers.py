@@ -9,20 +9,20 @@ This script performs a deeper investigation of problematic tickers by:
 4. Providing recommendations for ticker replacements
 """
 
-import yfinance as yf
-import pandas as pd
 import time
-import random
-import json
+import orjson
 import os
-from datetime import datetime, timedelta
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import colorama
-from colorama import Fore, Style
+from data_cache import cached, INFO_TTL, HISTORY_TTL
+from aex_tickers import load_commented_json
+from file_utils import write_atomic
+from terminal_colors import RED, GREEN, YELLOW, CYAN, BLUE, RST
 
-# Initialize colorama
-colorama.init()
+# yfinance, pandas, tenacity and the HTTP clients (through http_session and
+# yahoo_chart) are imported inside the functions that use them, so importing
+# this module stays fast
 
 # Setup logging
 logging.basicConfig(
@@ -41,10 +41,186 @@ PROBLEMATIC_TICKERS = {
     "URW.AS": ["URW.AS", "UNBP.AS"]     # Unibail-Rodamco-Westfield
 }
 
-def validate_ticker_deeply(ticker, max_retries=3):
-    """Perform a deep validation of a ticker with multiple data points"""
-    print(f"\n{Fore.CYAN}Deep validation of {ticker}...{Style.RESET_ALL}")
+# Number of tickers validated concurrently
+MAX_WORKERS = 8
+
+# Minimum amount of data for a ticker to pass the deep validation
+MIN_INFO_FIELDS = 10
+MIN_HISTORY_DAYS = 5
+
+def make_retrying(ticker, what, max_retries=3):
+    """
+    Build a tenacity retry controller for one validation request
+    
+    Transient network errors and unsuccessful attempts (a False return value)
+    are retried with randomized exponential backoff; any other exception
+    fails immediately. When retries run out the last result is returned, or
+    the last exception re-raised.
+    """
+    from tenacity import (
+        Retrying, stop_after_attempt, wait_random_exponential,
+        retry_if_exception_type, retry_if_result
+    )
+    from http_session import TRANSIENT_ERRORS
+    
+    def report_retry(retry_state):
+        if retry_state.outcome.failed:
+            reason = f"Error getting {what}: {str(retry_state.outcome.exception())}"
+        else:
+            reason = f"{what.capitalize()} insufficient"
+        print(f"  ⚠️ {ticker}: {reason}. Retrying in {retry_state.next_action.sleep:.2f}s "
+              f"(attempt {retry_state.attempt_number}/{max_retries})")
+    
+    return Retrying(
+        stop=stop_after_attempt(max_retries + 1),
+        wait=wait_random_exponential(multiplier=2, max=30),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS) | retry_if_result(lambda ok: not ok),
+        before_sleep=report_retry,
+        retry_error_callback=lambda retry_state: retry_state.outcome.result()
+    )
+
+def run_with_retries(ticker, what, attempt, max_retries=3):
+    """
+    Run one validation attempt function with retries
+    
+    Args:
+        ticker (str): Ticker symbol, used in retry messages
+        what (str): Description of the requested data, used in retry messages
+        attempt (callable): Returns True if the data is sufficient
+        max_retries (int): Maximum number of retry attempts
+    
+    Returns:
+        tuple: (ok, error) where error is the final exception, or None
+    """
+    try:
+        return make_retrying(ticker, what, max_retries)(attempt), None
+    except Exception as e:
+        return False, e
+
+# Only results that pass the deep validation are cached, so retries after
+# insufficient data query Yahoo again instead of replaying the cached result
+@cached('info', ttl=INFO_TTL, valid=lambda info: len(info) > MIN_INFO_FIELDS)
+def get_info(stock):
+    """Return stock.info, served from the cache when fresh and sufficient"""
+    return stock.info
+
+@cached('history', ttl=HISTORY_TTL, valid=lambda hist: len(hist) > MIN_HISTORY_DAYS)
+def get_history(stock, **params):
+    """Return stock.history(**params), served from the cache when fresh and sufficient"""
+    return stock.history(**params)
+
+def check_basic_info(stock, ticker, result, max_retries=3):
+    """
+    Fetch basic info for a ticker with retries and record it in result
     
+    Returns:
+        list: Error messages encountered
+    """
+    def attempt():
+        info = get_info(stock)
+        
+        # Check if we received meaningful data
+        if info and len(info) > MIN_INFO_FIELDS:  # More strict check for deep validation
+            result["basic_info_valid"] = True
+            result["company_name"] = info.get('shortName', info.get('longName', 'Unknown'))
+            result["price"] = info.get('currentPrice', info.get('regularMarketPrice'))
+            result["currency"] = info.get('currency')
+            result["market_cap"] = info.get('marketCap')
+            result["data_points"] = len(info)
+            return True
+        return False
+    
+    ok, error = run_with_retries(ticker, "basic info", attempt, max_retries)
+    if ok:
+        return []
+    if error is None:
+        print(f"  {RED}❌ {ticker}: Could not get sufficient basic info{RST}")
+        return ["Insufficient basic info data"]
+    print(f"  {RED}❌ {ticker}: Error getting basic info: {str(error)}{RST}")
+    return [f"Basic info error: {str(error)}"]
+
+def record_history(hist, result):
+    """
+    Record price history in result if it shows the ticker is actively trading
+    
+    Returns:
+        bool: True if the history is sufficient
+    """
+    if hist is None or hist.empty or len(hist) <= MIN_HISTORY_DAYS:
+        return False
+    result["historic_data_valid"] = True
+    result["historic_data_days"] = len(hist)
+    result["latest_close"] = hist['Close'].iloc[-1] if 'Close' in hist.columns else None
+    return True
+
+def chart_to_history(chart):
+    """
+    Convert a chart result from yahoo_chart.fetch_charts() into a history DataFrame
+    
+    Returns:
+        pd.DataFrame: Close prices indexed by date, or None if there is no data
+    """
+    import pandas as pd
+    
+    if not chart:
+        return None
+    timestamps = chart.get("timestamp") or []
+    quotes = chart.get("indicators", {}).get("quote") or [{}]
+    closes = quotes[0].get("close") or []
+    if not timestamps or len(closes) != len(timestamps):
+        return None
+    hist = pd.DataFrame({"Close": closes}, index=pd.to_datetime(timestamps, unit="s")).dropna()
+    return hist if not hist.empty else None
+
+def download_history_batch(tickers):
+    """
+    Download one month of price history for many tickers concurrently
+    
+    Validation only needs to know whether a ticker is trading, so this talks to
+    Yahoo's chart endpoint directly from a single asyncio event loop instead of
+    going through yfinance.
+    
+    Args:
+        tickers (list): Ticker symbols to download
+        
+    Returns:
+        dict: Ticker symbol to its history DataFrame (only tickers with data)
+    """
+    from yahoo_chart import fetch_charts
+    
+    histories = {ticker: chart_to_history(chart) for ticker, chart in fetch_charts(tickers, range="1mo").items()}
+    return {ticker: hist for ticker, hist in histories.items() if hist is not None}
+
+def check_historical_data(stock, ticker, result, max_retries=3):
+    """
+    Fetch one month of price history for a ticker with retries and record it in result
+    
+    Returns:
+        list: Error messages encountered
+    """
+    def attempt():
+        # Get 1 month of historical data (a fixed period keeps the cache key stable)
+        return record_history(get_history(stock, period="1mo"), result)
+    
+    ok, error = run_with_retries(ticker, "historical data", attempt, max_retries)
+    if ok:
+        return []
+    if error is None:
+        print(f"  {RED}❌ {ticker}: No historical data available{RST}")
+        return ["No historical data available"]
+    print(f"  {RED}❌ {ticker}: Error getting historical data: {str(error)}{RST}")
+    return [f"Historical data error: {str(error)}"]
+
+def validate_ticker_deeply(ticker, max_retries=3, hist_batch=None):
+    """
+    Perform a deep validation of a ticker with multiple data points
+    
+    Args:
+        ticker (str): The ticker symbol to validate
+        max_retries (int): Maximum number of retry attempts per request
+        hist_batch (dict, optional): Pre-downloaded histories from download_history_batch();
+                                     the history request is only made if the ticker is missing
+    """
     result = {
         "ticker": ticker,
         "basic_info_valid": False,
@@ -53,85 +229,34 @@ def validate_ticker_deeply(ticker, max_retries=3):
         "errors": []
     }
     
-    # 1. Try to get basic info
-    retries = 0
-    while retries <= max_retries:
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # Check if we received meaningful data
-            if info and len(info) > 10:  # More strict check for deep validation
-                result["basic_info_valid"] = True
-                result["company_name"] = info.get('shortName', info.get('longName', 'Unknown'))
-                result["price"] = info.get('currentPrice', info.get('regularMarketPrice'))
-                result["currency"] = info.get('currency')
-                result["market_cap"] = info.get('marketCap')
-                result["data_points"] = len(info)
-                break
-            else:
-                if retries < max_retries:
-                    retries += 1
-                    wait_time = 2 * (2 ** retries) * (1 + random.random())
-                    print(f"  ⚠️ Basic info insufficient. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    result["errors"].append("Insufficient basic info data")
-                    print(f"  {Fore.RED}❌ Could not get sufficient basic info{Style.RESET_ALL}")
-        except Exception as e:
-            if retries < max_retries:
-                retries += 1
-                wait_time = 3 * (2 ** retries) * (1 + random.random())
-                print(f"  ⚠️ Error getting basic info: {str(e)}. Retrying in {wait_time:.2f}s")
-                time.sleep(wait_time)
-            else:
-                result["errors"].append(f"Basic info error: {str(e)}")
-                print(f"  {Fore.RED}❌ Error getting basic info: {str(e)}{Style.RESET_ALL}")
-                break
-    
-    # 2. Try to get historical data (better indicator of a valid ticker)
-    retries = 0
-    while retries <= max_retries:
-        try:
-            stock = yf.Ticker(ticker)
-            # Get 1 month of historical data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
-            hist = stock.history(start=start_date, end=end_date)
-            
-            if not hist.empty and len(hist) > 5:
-                result["historic_data_valid"] = True
-                result["historic_data_days"] = len(hist)
-                result["latest_close"] = hist['Close'].iloc[-1] if 'Close' in hist.columns else None
-                break
-            else:
-                if retries < max_retries:
-                    retries += 1
-                    wait_time = 2 * (2 ** retries) * (1 + random.random())
-                    print(f"  ⚠️ No historical data. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    result["errors"].append("No historical data available")
-                    print(f"  {Fore.RED}❌ No historical data available{Style.RESET_ALL}")
-        except Exception as e:
-            if retries < max_retries:
-                retries += 1
-                wait_time = 3 * (2 ** retries) * (1 + random.random())
-                print(f"  ⚠️ Error getting historical data: {str(e)}. Retrying in {wait_time:.2f}s")
-                time.sleep(wait_time)
-            else:
-                result["errors"].append(f"Historical data error: {str(e)}")
-                print(f"  {Fore.RED}❌ Error getting historical data: {str(e)}{Style.RESET_ALL}")
-                break
+    # One Ticker object for both requests; basic info (1) and historical data (2,
+    # a better indicator of a valid ticker) are fetched concurrently and each is
+    # retried independently
+    import yfinance as yf
+    from http_session import get_session
+    stock = yf.Ticker(ticker, session=get_session())
+    if hist_batch and record_history(hist_batch.get(ticker), result):
+        result["errors"] = check_basic_info(stock, ticker, result, max_retries)
+    else:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            info_future = executor.submit(check_basic_info, stock, ticker, result, max_retries)
+            hist_future = executor.submit(check_historical_data, stock, ticker, result, max_retries)
+            result["errors"] = info_future.result() + hist_future.result()
     
     # 3. Determine overall validity
     result["valid"] = result["basic_info_valid"] and result["historic_data_valid"]
     
-    # Print summary
+    return result
+
+def print_validation_result(result):
+    """Print the summary of a deep validation result"""
+    ticker = result["ticker"]
+    print(f"\n{CYAN}Deep validation of {ticker}...{RST}")
+    
     if result["valid"]:
-        print(f"  {Fore.GREEN}✓ Ticker {ticker} is fully valid!{Style.RESET_ALL}")
+        print(f"  {GREEN}✓ Ticker {ticker} is fully valid!{RST}")
         if result["company_name"]:
-            print(f"  Company: {Fore.YELLOW}{result['company_name']}{Style.RESET_ALL}")
+            print(f"  Company: {YELLOW}{result['company_name']}{RST}")
         if result.get("price") and result.get("currency"):
             print(f"  Price: {result['price']} {result['currency']}")
         if result.get("latest_close"):
@@ -139,40 +264,74 @@ def validate_ticker_deeply(ticker, max_retries=3):
         if result.get("historic_data_days"):
             print(f"  Historical data: {result['historic_data_days']} days available")
     else:
-        print(f"  {Fore.RED}❌ Ticker {ticker} has issues:{Style.RESET_ALL}")
+        print(f"  {RED}❌ Ticker {ticker} has issues:{RST}")
         if not result["basic_info_valid"]:
-            print(f"  - Basic info: {Fore.RED}Invalid{Style.RESET_ALL}")
+            print(f"  - Basic info: {RED}Invalid{RST}")
         if not result["historic_data_valid"]:
-            print(f"  - Historical data: {Fore.RED}Invalid{Style.RESET_ALL}")
+            print(f"  - Historical data: {RED}Invalid{RST}")
         if result["errors"]:
             for error in result["errors"]:
                 print(f"  - Error: {error}")
+
+def validate_tickers_concurrently(tickers, hist_batch=None):
+    """
+    Deep-validate several tickers in parallel
     
-    return result
+    The work is network-bound, so a thread pool lets the requests (and their
+    retry waits) overlap; summaries are printed afterwards by the caller so
+    the output of different tickers does not interleave.
+    
+    Args:
+        tickers (list): Ticker symbols to validate
+        hist_batch (dict, optional): Pre-downloaded histories; downloaded here if not given
+    
+    Returns:
+        dict: Ticker symbol to validation result
+    """
+    # Price history for all tickers comes from a few batched downloads
+    if hist_batch is None:
+        hist_batch = download_history_batch(tickers)
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(lambda t: validate_ticker_deeply(t, hist_batch=hist_batch), tickers)
+        return dict(zip(tickers, results))
 
 def check_replacement_tickers():
     """Check and validate problematic tickers and their replacements"""
-    print(f"\n{Fore.BLUE}=== Investigating Problematic AEX Tickers ==={Style.RESET_ALL}")
+    print(f"\n{BLUE}=== Investigating Problematic AEX Tickers ==={RST}")
     
-    results = {}
     replacements = {}
     
+    # Price history for every problematic ticker and alternative comes from one
+    # batched pre-pass; the problematic tickers themselves are validated in parallel
+    all_tickers = list(dict.fromkeys(
+        t for ticker, alternatives in PROBLEMATIC_TICKERS.items() for t in [ticker, *alternatives]
+    ))
+    hist_batch = download_history_batch(all_tickers)
+    results = validate_tickers_concurrently(list(PROBLEMATIC_TICKERS), hist_batch)
+    
     # Check each problematic ticker and its alternatives
     for ticker, alternatives in PROBLEMATIC_TICKERS.items():
-        print(f"\n{Fore.CYAN}Investigating {ticker} and potential replacements...{Style.RESET_ALL}")
+        print(f"\n{CYAN}Investigating {ticker} and potential replacements...{RST}")
         
         # Test the original problematic ticker
-        original_result = validate_ticker_deeply(ticker)
-        results[ticker] = original_result
+        original_result = results[ticker]
+        print_validation_result(original_result)
         
-        # Test alternative tickers
+        # Test alternative tickers in order, stopping at the first valid one
         alt_results = []
-        for alt_ticker in alternatives:
-            if alt_ticker != ticker:  # Skip if same as original
-                print(f"\n{Fore.YELLOW}Testing alternative: {alt_ticker}{Style.RESET_ALL}")
-                alt_result = validate_ticker_deeply(alt_ticker)
+        if not original_result["valid"]:
+            for alt_ticker in alternatives:
+                if alt_ticker == ticker:  # Skip if same as original
+                    continue
+                print(f"\n{YELLOW}Testing alternative: {alt_ticker}{RST}")
+                if alt_ticker not in results:
+                    results[alt_ticker] = validate_ticker_deeply(alt_ticker, hist_batch=hist_batch)
+                alt_result = results[alt_ticker]
+                print_validation_result(alt_result)
                 alt_results.append(alt_result)
-                results[alt_ticker] = alt_result
+                if alt_result["valid"]:
+                    break
         
         # Determine best replacement
         best_replacement = None
@@ -183,9 +342,9 @@ def check_replacement_tickers():
             valid_alternatives = [r for r in alt_results if r["valid"]]
             if valid_alternatives:
                 best_replacement = valid_alternatives[0]["ticker"]
-                print(f"\n{Fore.GREEN}Found valid replacement for {ticker}: {best_replacement}{Style.RESET_ALL}")
+                print(f"\n{GREEN}Found valid replacement for {ticker}: {best_replacement}{RST}")
             else:
-                print(f"\n{Fore.RED}No valid replacement found for {ticker}!{Style.RESET_ALL}")
+                print(f"\n{RED}No valid replacement found for {ticker}!{RST}")
         
         replacements[ticker] = best_replacement
     
@@ -193,17 +352,11 @@ def check_replacement_tickers():
     try:
         # Load current tickers.json
         current_tickers_file = os.path.join(os.path.dirname(__file__), 'tickers.json')
-        with open(current_tickers_file, 'r') as f:
-            # Handle commented JSON by skipping lines that start with //
-            json_content = ""
-            for line in f:
-                if not line.strip().startswith('//'):
-                    json_content += line
-            
-            current_data = json.loads(json_content)
-            current_tickers = current_data.get("AEX_TICKERS", [])
+        # Handle commented JSON by stripping lines that start with //
+        current_data = load_commented_json(current_tickers_file) or {}
+        current_tickers = current_data.get("AEX_TICKERS", [])
     except Exception as e:
-        print(f"{Fore.RED}Error reading current tickers.json: {str(e)}{Style.RESET_ALL}")
+        print(f"{RED}Error reading current tickers.json: {str(e)}{RST}")
         current_tickers = []
     
     # Create updated tickers list with replacements
@@ -216,22 +369,22 @@ def check_replacement_tickers():
             updated_tickers.append(ticker)  # Keep original
     
     # Print summary and recommendations
-    print(f"\n{Fore.BLUE}=== Summary and Recommendations ==={Style.RESET_ALL}")
+    print(f"\n{BLUE}=== Summary and Recommendations ==={RST}")
     for ticker, replacement in replacements.items():
         if replacement and ticker != replacement:
-            print(f"{Fore.YELLOW}• Replace {ticker} with {replacement}{Style.RESET_ALL}")
+            print(f"{YELLOW}• Replace {ticker} with {replacement}{RST}")
         elif replacement and ticker == replacement:
-            print(f"{Fore.GREEN}• Keep {ticker} (it's valid){Style.RESET_ALL}")
+            print(f"{GREEN}• Keep {ticker} (it's valid){RST}")
         else:
-            print(f"{Fore.RED}• No valid replacement found for {ticker}{Style.RESET_ALL}")
+            print(f"{RED}• No valid replacement found for {ticker}{RST}")
     
     # Display recommended updated tickers.json
-    print(f"\n{Fore.CYAN}Recommended updated tickers.json:{Style.RESET_ALL}")
+    print(f"\n{CYAN}Recommended updated tickers.json:{RST}")
     updated_data = {"AEX_TICKERS": updated_tickers}
-    print(json.dumps(updated_data, indent=4))
+    print(orjson.dumps(updated_data, option=orjson.OPT_INDENT_2).decode())
     
     # Ask user if they want to update tickers.json
-    print(f"\n{Fore.YELLOW}Would you like to update tickers.json with these changes? (y/n){Style.RESET_ALL}")
+    print(f"\n{YELLOW}Would you like to update tickers.json with these changes? (y/n){RST}")
     choice = input().lower()
     if choice == 'y' or choice == 'yes':
         # Create backup
@@ -241,18 +394,17 @@ def check_replacement_tickers():
         
         try:
             # Backup current file
-            with open(current_tickers_file, 'r') as f_in, open(backup_file, 'w') as f_out:
-                f_out.write(f_in.read())
-            print(f"{Fore.GREEN}Created backup at {backup_file}{Style.RESET_ALL}")
+            shutil.copyfile(current_tickers_file, backup_file)
+            print(f"{GREEN}Created backup at {backup_file}{RST}")
             
-            # Update tickers.json
-            with open(current_tickers_file, 'w') as f:
-                json.dump(updated_data, f, indent=4)
-            print(f"{Fore.GREEN}Successfully updated tickers.json!{Style.RESET_ALL}")
+            # Update tickers.json through a synced temporary file, so a crash
+            # never leaves a truncated file behind
+            write_atomic(current_tickers_file, orjson.dumps(updated_data, option=orjson.OPT_INDENT_2))
+            print(f"{GREEN}Successfully updated tickers.json!{RST}")
         except Exception as e:
-            print(f"{Fore.RED}Error updating tickers.json: {str(e)}{Style.RESET_ALL}")
+            print(f"{RED}Error updating tickers.json: {str(e)}{RST}")
     else:
-        print(f"{Fore.YELLOW}No changes made to tickers.json{Style.RESET_ALL}")
+        print(f"{YELLOW}No changes made to tickers.json{RST}")
 
 if __name__ == "__main__":
     check_replacement_tickers()
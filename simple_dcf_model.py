@@ -3,12 +3,14 @@
 AEX Simple DCF Model - A simplified DCF calculation
 """
 
-import yfinance as yf
-import pandas as pd
-import numpy as np
 import logging
-import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from data_cache import get_info, get_cashflow
+from http_session import get_session
+
+# yfinance, pandas and NumPy are imported inside the functions that use them,
+# so importing this module stays fast
 
 # Configure logging to console
 logging.basicConfig(
@@ -18,36 +20,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def calculate_dcf(ticker_symbol):
-    """A simplified DCF calculation based on available free cash flow data"""
+def fetch_dcf_inputs(ticker):
+    """
+    Fetch the data needed for a DCF calculation
     
-    logger.info(f"Starting DCF calculation for {ticker_symbol}")
+    Args:
+        ticker (yf.Ticker): The ticker object to fetch data for
+        
+    Returns:
+        tuple: (info dict, cash flow DataFrame)
+    """
+    return get_info(ticker), get_cashflow(ticker)
+
+def calculate_dcf_from_data(ticker_symbol, info, cashflow):
+    """
+    A simplified DCF calculation based on pre-fetched info and cash flow data
     
-    try:
-        # Get ticker data
-        ticker = yf.Ticker(ticker_symbol)
-        logger.info(f"Retrieved ticker data for {ticker_symbol}")
+    Args:
+        ticker_symbol (str): The ticker symbol
+        info (dict): Ticker info from yfinance
+        cashflow (pd.DataFrame): Cash flow statement from yfinance
         
+    Returns:
+        dict: DCF results, or None if the calculation is not possible
+    """
+    import pandas as pd
+    import numpy as np
+    
+    try:
         # Get basic info
-        info = ticker.info
         company_name = info.get('shortName', ticker_symbol)
         current_price = info.get('currentPrice')
         shares_outstanding = info.get('sharesOutstanding')
         
-        logger.info(f"Company: {company_name}, Current Price: {current_price}, Shares: {shares_outstanding}")
-        
-        # Get cash flow data
-        cashflow = ticker.cashflow
-        logger.info(f"Retrieved cash flow data with shape: {cashflow.shape if isinstance(cashflow, pd.DataFrame) else 'None'}")
+        logger.info("Company: %s, Current Price: %s, Shares: %s", company_name, current_price, shares_outstanding)
+        logger.debug("Retrieved cash flow data with shape: %s", cashflow.shape if isinstance(cashflow, pd.DataFrame) else None)
         
         # Check if free cash flow data is available
         if isinstance(cashflow, pd.DataFrame) and 'Free Cash Flow' in cashflow.index:
             fcf_data = cashflow.loc['Free Cash Flow'].dropna()
-            logger.info(f"Free Cash Flow data: {fcf_data}")
+            logger.debug("Free Cash Flow data: %s", fcf_data)
             
             if len(fcf_data) > 0:
                 recent_fcf = fcf_data.iloc[0]
-                logger.info(f"Recent FCF: {recent_fcf}")
+                logger.info("Recent FCF: %s", recent_fcf)
             else:
                 logger.warning("No FCF data available in cash flow statement")
                 return None
@@ -56,7 +72,7 @@ def calculate_dcf(ticker_symbol):
             logger.info("Trying to get FCF from info attribute")
             if 'freeCashflow' in info and info['freeCashflow'] is not None:
                 recent_fcf = info['freeCashflow']
-                logger.info(f"FCF from info: {recent_fcf}")
+                logger.info("FCF from info: %s", recent_fcf)
             else:
                 logger.warning("No FCF data available")
                 return None
@@ -70,42 +86,39 @@ def calculate_dcf(ticker_symbol):
         # Try to get better growth rate if available
         if 'revenueGrowth' in info and info['revenueGrowth'] is not None:
             growth_rate = min(max(info['revenueGrowth'], 0.01), 0.15)  # Cap between 1% and 15%
-            logger.info(f"Using revenue growth rate: {growth_rate:.2%}")
+            logger.info("Using revenue growth rate: %.2f%%", growth_rate * 100)
+        
+        # Simple DCF calculation (vectorized over the forecast years)
+        years = np.arange(1, forecast_years + 1)
+        discount_factors = (1 + wacc) ** years
         
-        # Simple DCF calculation
         # 1. Project future cash flows
-        projected_cash_flows = []
-        for year in range(1, forecast_years + 1):
-            projected_fcf = recent_fcf * (1 + growth_rate) ** year
-            projected_cash_flows.append(projected_fcf)
-            logger.info(f"Year {year} projected FCF: {projected_fcf:,.2f}")
+        projected_cash_flows = recent_fcf * (1 + growth_rate) ** years
+        logger.debug("Projected FCF by year: %s", projected_cash_flows.tolist())
             
         # 2. Calculate terminal value
         terminal_value = projected_cash_flows[-1] * (1 + terminal_growth) / (wacc - terminal_growth)
-        logger.info(f"Terminal value: {terminal_value:,.2f}")
+        logger.info("Terminal value: %.2f", terminal_value)
         
         # 3. Calculate present value of cash flows
-        present_values = []
-        for year, cash_flow in enumerate(projected_cash_flows, 1):
-            pv = cash_flow / (1 + wacc) ** year
-            present_values.append(pv)
-            logger.info(f"Year {year} PV: {pv:,.2f}")
+        present_values = projected_cash_flows / discount_factors
+        logger.debug("PV by year: %s", present_values.tolist())
             
         # 4. Calculate present value of terminal value
-        terminal_pv = terminal_value / (1 + wacc) ** forecast_years
-        logger.info(f"Terminal value PV: {terminal_pv:,.2f}")
+        terminal_pv = terminal_value / discount_factors[-1]
+        logger.debug("Terminal value PV: %.2f", terminal_pv)
         
         # 5. Calculate enterprise value
-        enterprise_value = sum(present_values) + terminal_pv
-        logger.info(f"Enterprise value: {enterprise_value:,.2f}")
+        enterprise_value = present_values.sum() + terminal_pv
+        logger.debug("Enterprise value: %.2f", enterprise_value)
         
         # 6. Calculate fair value per share
         fair_value = enterprise_value / shares_outstanding
-        logger.info(f"Fair value per share: {fair_value:.2f}")
+        logger.info("Fair value per share: %.2f", fair_value)
         
         # Calculate discount/premium
         discount_percent = ((fair_value / current_price) - 1) * 100
-        logger.info(f"Discount/premium: {discount_percent:.2f}%")
+        logger.info("Discount/premium: %.2f%%", discount_percent)
         
         return {
             'ticker': ticker_symbol,
@@ -118,34 +131,74 @@ def calculate_dcf(ticker_symbol):
         }
         
     except Exception as e:
-        logger.error(f"Error calculating DCF for {ticker_symbol}: {str(e)}")
+        logger.error("Error calculating DCF for %s: %s", ticker_symbol, e)
         import traceback
         traceback.print_exc()
         return None
 
-if __name__ == "__main__":
-    # Test with ASML
-    ticker = "ASML.AS"
-    result = calculate_dcf(ticker)
+def calculate_dcf(ticker_symbol):
+    """A simplified DCF calculation based on available free cash flow data"""
+    
+    logger.info("Starting DCF calculation for %s", ticker_symbol)
     
-    if result:
-        print(f"\nDCF Results for {ticker}:")
-        print(f"Company: {result['company']}")
-        print(f"Fair Value: €{result['fair_value']:.2f}")
-        print(f"Current Price: €{result['current_price']:.2f}")
-        print(f"Discount/Premium: {result['discount_percent']:.2f}%")
-    else:
-        print(f"Failed to calculate DCF for {ticker}")
+    try:
+        # Get ticker data
+        import yfinance as yf
+        ticker = yf.Ticker(ticker_symbol, session=get_session())
+        logger.info("Retrieved ticker data for %s", ticker_symbol)
+        info, cashflow = fetch_dcf_inputs(ticker)
+    except Exception as e:
+        logger.error("Error fetching DCF data for %s: %s", ticker_symbol, e)
+        return None
+    
+    return calculate_dcf_from_data(ticker_symbol, info, cashflow)
+
+def run_dcf_batch(ticker_symbols, max_workers=8):
+    """
+    Run the simplified DCF for many tickers, fetching their data concurrently
+    
+    Args:
+        ticker_symbols (list): Ticker symbols to value
+        max_workers (int): Number of concurrent fetches
         
-    # Test with ING
-    ticker = "INGA.AS"
-    result = calculate_dcf(ticker)
+    Returns:
+        dict: Ticker symbol to DCF result (None where the calculation failed)
+    """
+    logger.info("Fetching DCF inputs for %d tickers", len(ticker_symbols))
+    import yfinance as yf
+    tickers = yf.Tickers(" ".join(ticker_symbols), session=get_session())
     
-    if result:
-        print(f"\nDCF Results for {ticker}:")
-        print(f"Company: {result['company']}")
-        print(f"Fair Value: €{result['fair_value']:.2f}")
-        print(f"Current Price: €{result['current_price']:.2f}")
-        print(f"Discount/Premium: {result['discount_percent']:.2f}%")
-    else:
-        print(f"Failed to calculate DCF for {ticker}")
+    def fetch(ticker_symbol):
+        try:
+            return fetch_dcf_inputs(tickers.tickers[ticker_symbol])
+        except Exception as e:
+            logger.error("Error fetching DCF data for %s: %s", ticker_symbol, e)
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        inputs = dict(zip(ticker_symbols, executor.map(fetch, ticker_symbols)))
+    
+    results = {}
+    for ticker_symbol in ticker_symbols:
+        logger.info("Starting DCF calculation for %s", ticker_symbol)
+        if inputs[ticker_symbol] is None:
+            results[ticker_symbol] = None
+        else:
+            results[ticker_symbol] = calculate_dcf_from_data(ticker_symbol, *inputs[ticker_symbol])
+    return results
+
+if __name__ == "__main__":
+    # Test with ASML and ING (fetched concurrently)
+    test_tickers = ["ASML.AS", "INGA.AS"]
+    results = run_dcf_batch(test_tickers, max_workers=4)
+    
+    for ticker in test_tickers:
+        result = results[ticker]
+        if result:
+            print(f"\nDCF Results for {ticker}:")
+            print(f"Company: {result['company']}")
+            print(f"Fair Value: €{result['fair_value']:.2f}")
+            print(f"Current Price: €{result['current_price']:.2f}")
+            print(f"Discount/Premium: {result['discount_percent']:.2f}%")
+        else:
+            print(f"Failed to calculate DCF for {ticker}")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+AEX Terminal Colors - Color prefixes for console output
+
+The prefixes are resolved once at import instead of per print. colorama is
+only loaded for terminals, so no ANSI codes end up in piped output or CI
+logs; there every prefix is an empty string.
+
+Usage:
+    from terminal_colors import RED, GREEN, RST
+
+    print(f"{GREEN}✓ Valid ticker!{RST}")
+"""
+
+import sys
+
+if sys.stdout.isatty():
+    import colorama
+    from colorama import Fore, Style
+    colorama.init()
+    RED = Fore.RED
+    GREEN = Fore.GREEN
+    YELLOW = Fore.YELLOW
+    CYAN = Fore.CYAN
+    BLUE = Fore.BLUE
+    RST = Style.RESET_ALL
+else:
+    RED = GREEN = YELLOW = CYAN = BLUE = RST = ""
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the configuration backups in config_manager.py
+
+Checks that write_atomic() replaces files without leaving temporary files
+and that backup_config() keeps only the newest MAX_CONFIG_BACKUPS backups.
+Runs in a temporary directory, so the real configuration is never touched.
+"""
+
+import os
+import sys
+import glob
+import gzip
+import time
+import logging
+import tempfile
+
+def test_write_atomic(config_manager):
+    """write_atomic() replaces the whole file, keeps its mode and removes its temporary file"""
+    config_manager.write_atomic('config.json', b'{"old": true, "padding": "xxxxxxxx"}')
+    os.chmod('config.json', 0o640)
+    config_manager.write_atomic('config.json', b'{"new": true}')
+
+    with open('config.json', 'rb') as f:
+        assert f.read() == b'{"new": true}'
+    assert os.stat('config.json').st_mode & 0o777 == 0o640
+    assert not glob.glob('*.tmp')
+
+def test_backup_rotation(config_manager):
+    """backup_config() compresses the content and removes the oldest backups"""
+    backup_dir = config_manager.CONFIG_BACKUP_DIR
+    os.makedirs(backup_dir, exist_ok=True)
+
+    # Backup names are timestamped to the second, so the older backups are
+    # created directly, each an hour older than the next
+    now = time.time()
+    old_backups = []
+    for i in range(config_manager.MAX_CONFIG_BACKUPS + 2):
+        path = os.path.join(backup_dir, f"fair_values_config_backup_20240101_{i:06d}.json.gz")
+        with gzip.open(path, 'wb') as f:
+            f.write(b'{}')
+        mtime = now - (i + 1) * 3600
+        os.utime(path, (mtime, mtime))
+        old_backups.append(path)
+
+    backup_file = config_manager.backup_config(b'{"sources": {}}')
+
+    with gzip.open(backup_file, 'rb') as f:
+        assert f.read() == b'{"sources": {}}'
+
+    remaining = set(glob.glob(os.path.join(backup_dir, "fair_values_config_backup_*.json.gz")))
+    assert len(remaining) == config_manager.MAX_CONFIG_BACKUPS
+    # The new backup and the newest old ones are kept; the three oldest are removed
+    assert os.path.normpath(backup_file) in {os.path.normpath(path) for path in remaining}
+    kept = set(old_backups[:config_manager.MAX_CONFIG_BACKUPS - 1])
+    assert {os.path.normpath(path) for path in kept} <= {os.path.normpath(path) for path in remaining}
+
+def main():
+    """Run all checks in a temporary working directory"""
+    print("====== CONFIG BACKUP TESTS ======")
+    tests = [test_write_atomic, test_backup_rotation]
+    failed = 0
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # config_manager uses paths relative to the working directory
+        # (including its log file), so it is imported from there
+        os.chdir(work_dir)
+        try:
+            import config_manager
+            for test in tests:
+                try:
+                    test(config_manager)
+                    print(f"✅ {test.__name__}")
+                except AssertionError as e:
+                    failed += 1
+                    print(f"❌ {test.__name__}: {e or 'assertion failed'}")
+        finally:
+            # Close the log file so the directory can be removed
+            logging.shutdown()
+            os.chdir(cwd)
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
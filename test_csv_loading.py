@@ -13,19 +13,14 @@ if os.path.exists(csv_file):
     try:
         csv_tickers = []
         with open(csv_file, 'r') as f:
-            # Skip lines that start with //
-            while True:
-                pos = f.tell()
-                line = f.readline()
-                if not line or not line.startswith('//'):
-                    f.seek(pos)
-                    break
-            
-            # Parse the CSV content
-            reader = csv.DictReader(f)
-            for row in reader:
-                if 'yahoo_ticker' in row and row['yahoo_ticker'].strip():
-                    csv_tickers.append(row['yahoo_ticker'].strip())
+            # Parse the CSV content, streaming past lines that start with //
+            reader = csv.reader(line for line in f if not line.startswith('//'))
+            header = next(reader, [])
+            if 'yahoo_ticker' in header:
+                # Only the yahoo_ticker column is needed, so index into plain rows
+                idx = header.index('yahoo_ticker')
+                csv_tickers = [row[idx].strip() for row in reader
+                               if len(row) > idx and row[idx].strip()]
         
         if csv_tickers and len(csv_tickers) > 0:
             print(f"Loaded {len(csv_tickers)} tickers from {csv_file}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk cache in data_cache.py
+
+Checks TTL expiry, that empty or invalid results are never cached, and that
+concurrent writes of the same entry never leave temporary files behind.
+Runs against a temporary cache directory, without network access.
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from data_cache import FileCache, cached
+
+class FakeStock:
+    """Stand-in for yf.Ticker; the cache only reads its ticker attribute"""
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+def age_entry(cache, ticker, endpoint, seconds, params=None):
+    """Move the modification time of a cache entry back by the given number of seconds"""
+    path = cache._path(ticker, endpoint, params or {})
+    mtime = os.path.getmtime(path) - seconds
+    os.utime(path, (mtime, mtime))
+
+def test_ttl_expiry(cache_dir):
+    """Entries are served until they are ttl seconds old"""
+    cache = FileCache(cache_dir)
+    cache.set("ASML.AS", "info", {"shortName": "ASML"})
+
+    assert cache.get("ASML.AS", "info", ttl=60) == (True, {"shortName": "ASML"})
+    assert cache.get("ASML.AS", "info", params={"period": "1mo"}, ttl=60) == (False, None)
+
+    age_entry(cache, "ASML.AS", "info", 120)
+    assert cache.get("ASML.AS", "info", ttl=300) == (True, {"shortName": "ASML"})
+    assert cache.get("ASML.AS", "info", ttl=60) == (False, None)
+
+def test_unusable_results_not_cached(cache_dir):
+    """Empty results and results rejected by valid are fetched again on every call"""
+    cache = FileCache(cache_dir)
+    responses = iter([{}, {"a": 1}, {"a": 1, "b": 2}, {"a": 3}])
+    calls = []
+
+    @cached("info", cache=cache, valid=lambda info: len(info) > 1)
+    def get_info(stock):
+        calls.append(stock.ticker)
+        return next(responses)
+
+    stock = FakeStock("INGA.AS")
+    assert get_info(stock) == {}
+    assert get_info(stock) == {"a": 1}
+    assert get_info(stock) == {"a": 1, "b": 2}
+    # The first valid result is served from the cache from now on
+    assert get_info(stock) == {"a": 1, "b": 2}
+    assert len(calls) == 3
+
+def test_concurrent_writes(cache_dir):
+    """Concurrent writers of one entry leave a readable entry and no temporary files"""
+    cache = FileCache(cache_dir)
+
+    def write(i):
+        for n in range(50):
+            cache.set("ADYEN.AS", "info", {"writer": i, "n": n})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write, range(4)))
+
+    hit, value = cache.get("ADYEN.AS", "info", ttl=60)
+    assert hit and value["n"] == 49
+    assert not [name for name in os.listdir(os.path.join(cache_dir, "ADYEN.AS")) if name.endswith(".tmp")]
+
+def main():
+    """Run all checks, each against a fresh cache directory"""
+    print("====== DATA CACHE TESTS ======")
+    tests = [test_ttl_expiry, test_unusable_results_not_cached, test_concurrent_writes]
+    failed = 0
+
+    for test in tests:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            try:
+                test(cache_dir)
+                print(f"✅ {test.__name__}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {test.__name__}: {e or 'assertion failed'}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
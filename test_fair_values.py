@@ -5,6 +5,7 @@ Test script to check which fair values are being used
 
 import logging
 import sys
+import pandas as pd
 
 # Setup logging to console
 logging.basicConfig(
@@ -16,17 +17,18 @@ logging.basicConfig(
 )
 
 # Import the configuration manager
-from config_manager import load_fair_values
+from config_manager import load_all_fair_values
 
 def main():
     """Compare fair values from different sources"""
     print("====== FAIR VALUE SOURCES COMPARISON ======")
     
-    # Load values from different sources
-    dcf_values = load_fair_values(source='dcf')
-    manual_values = load_fair_values(source='manual')
-    analyst_values = load_fair_values(source='analyst')
-    combined_values = load_fair_values()  # This uses the priority system
+    # Load values from different sources with a single configuration read
+    all_values = load_all_fair_values()
+    dcf_values = all_values['dcf']
+    manual_values = all_values['manual']
+    analyst_values = all_values['analyst']
+    combined_values = all_values['combined']  # This uses the priority system
     
     # Print some sample values for comparison
     sample_tickers = ["ASML.AS", "ADYEN.AS", "ABN.AS"]
@@ -42,20 +44,23 @@ def main():
     # Compare all values to see which source is being used
     print("\n--- Source Usage Statistics ---")
     total_tickers = len(combined_values)
-    using_dcf = 0
-    using_manual = 0
-    using_analyst = 0
-    unknown = 0
     
-    for ticker, value in combined_values.items():
-        if ticker in dcf_values and abs(dcf_values[ticker] - value) < 0.01:
-            using_dcf += 1
-        elif ticker in manual_values and abs(manual_values[ticker] - value) < 0.01:
-            using_manual += 1
-        elif ticker in analyst_values and abs(analyst_values[ticker] - value) < 0.01:
-            using_analyst += 1
-        else:
-            unknown += 1
+    # Attribute each combined value to the first source (dcf, manual, analyst) it matches;
+    # tickers missing from a source compare as NaN and never match it
+    df = pd.DataFrame({
+        'combined': combined_values,
+        'dcf': dcf_values,
+        'manual': manual_values,
+        'analyst': analyst_values
+    }).dropna(subset=['combined'])
+    is_dcf = (df['combined'] - df['dcf']).abs() < 0.01
+    is_manual = ~is_dcf & ((df['combined'] - df['manual']).abs() < 0.01)
+    is_analyst = ~is_dcf & ~is_manual & ((df['combined'] - df['analyst']).abs() < 0.01)
+    
+    using_dcf = int(is_dcf.sum())
+    using_manual = int(is_manual.sum())
+    using_analyst = int(is_analyst.sum())
+    unknown = total_tickers - using_dcf - using_manual - using_analyst
     
     print(f"Total tickers: {total_tickers}")
     print(f"Using DCF values: {using_dcf} ({using_dcf/total_tickers*100:.1f}%)")
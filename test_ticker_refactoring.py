@@ -33,6 +33,9 @@ def test_ticker_loading():
         print("\nFirst 5 tickers:")
         for i, ticker in enumerate(tickers[:5]):
             print(f"  {i+1}. {ticker}")
+    
+    assert source_info['source'] in ('csv_file', 'json_file'), "Tickers could not be loaded from CSV or JSON"
+    assert tickers, "No tickers were loaded"
 
 def test_special_cases():
     """Test if special case handling would be needed (should not be needed now)"""
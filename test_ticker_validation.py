@@ -13,46 +13,128 @@ Usage:
     python test_ticker_validation.py --verbose ASML.AS      # Show detailed information
     python test_ticker_validation.py --check-fields ASML.AS # Check for key data fields
     python test_ticker_validation.py --all                  # Test all tickers from CSV
-    python test_ticker_validation.py --all --wait 2         # Customize wait time between tests
+    python test_ticker_validation.py --all --threads 16     # Validate 16 tickers at a time
+    python test_ticker_validation.py --all --threads 1 --wait 2  # Validate serially, 2s apart
     python test_ticker_validation.py --very-verbose ASML.AS # Show all available fields
+    python test_ticker_validation.py --no-cache ASML.AS     # Always fetch fresh data
     
 Options:
     --verbose, -v      : Show detailed ticker information
     --very-verbose, -vv: Show all available fields
     --check-fields, -c : Check for completeness of key data fields
     --all, -a          : Test all tickers from amsterdam_aex_tickers.csv
-    --wait, -w         : Set wait time between tests (default: 3s)
+    --threads, -t      : Number of tickers validated concurrently (default: 8)
+    --wait, -w         : Set wait time between serial tests (default: 3s)
+    --no-cache         : Ignore the on-disk cache of ticker info
 """
 
 import logging
 import time
-import random
 import sys
 import argparse
 import os
-import csv
+import re
+import functools
+import threading
+import itertools
+import io
 import pandas as pd
 import yfinance as yf
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from http_session import (
+    get_session, TRANSIENT_ERRORS, NON_RETRYABLE_STATUS, RETRY_BASE_DELAY,
+    next_backoff, http_status, retry_after
 )
+from data_cache import cached
+from yahoo_chart import fetch_charts
+
+# Logging is configured in __main__ so importing the validation functions
+# leaves the importer's logging setup alone
 logger = logging.getLogger(__name__)
 
 # Key fields we want to check for data completeness
-KEY_FIELDS = [
+KEY_FIELDS = (
     'shortName', 'longName', 'currentPrice', 'regularMarketPrice', 
     'sharesOutstanding', 'marketCap', 'volume', 'averageVolume', 
     'exchange', 'currency'
-]
+)
+
+# Key field a ticker's info must carry for the ticker to validate
+PRICE_FIELD = 'regularMarketPrice'
+
+# Ticker info validated within this window is served from the on-disk cache
+VALIDATION_CACHE_TTL = 10 * 60  # 10 minutes in seconds
+
+# Ticker objects for all tickers under test, created by one yf.Tickers batch in __main__
+TICKER_BATCH = {}
+
+# Whether fetch_info() may use the on-disk cache (disabled by --no-cache)
+USE_CACHE = True
+
+# Fields shown in verbose mode, as (label, info key) pairs
+VERBOSE_FIELDS = (
+    ('Full Name', 'longName'), ('Sector', 'sector'), ('Industry', 'industry'),
+    ('Website', 'website'), ('Market Cap', 'marketCap'),
+    ('52 Week High', 'fiftyTwoWeekHigh'), ('52 Week Low', 'fiftyTwoWeekLow')
+)
+
+# Plausible Yahoo Finance symbols (e.g. ASML.AS, BRK-B, ^AEX); anything else is
+# rejected locally instead of costing a failed request and its retries
+TICKER_PATTERN = re.compile(r'^\^?[A-Z0-9][A-Z0-9.=\-]{0,14}$', re.IGNORECASE)
+
+# Info fetches currently in progress, so concurrent requests for one ticker share a download
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=256)
+def get_ticker(ticker):
+    """
+    Return a shared yf.Ticker for a symbol
+    
+    yfinance keeps the fetched .info on the Ticker object, so reusing the
+    object means each ticker's info is only downloaded once per run.
+    """
+    return TICKER_BATCH.get(ticker) or yf.Ticker(ticker, session=get_session())
+
+def has_price(info):
+    """Return True if the info carries the price needed to validate the ticker"""
+    return info.get(PRICE_FIELD) is not None
+
+# Info without a price is neither cached nor served from the cache, so it is
+# never replayed for the full TTL
+@cached('info', ttl=VALIDATION_CACHE_TTL, valid=has_price)
+def get_cached_info(stock):
+    """Return stock.info, served from the on-disk cache if fetched in the last 10 minutes"""
+    return stock.info
 
-def validate_ticker_with_retries(ticker, verbose=False, very_verbose=False, check_fields=False):
+def fetch_info(ticker):
+    """
+    Return the info of a ticker, using the on-disk cache unless it is disabled
+    
+    If another thread is already fetching the same ticker (e.g. it is listed
+    twice), this waits for and returns that result instead of downloading again.
+    """
+    with _inflight_lock:
+        future = _inflight.get(ticker)
+        owner = future is None
+        if owner:
+            future = _inflight[ticker] = Future()
+    if not owner:
+        return future.result()
+    
+    try:
+        stock = get_ticker(ticker)
+        info = get_cached_info(stock) if USE_CACHE else stock.info
+        future.set_result(info)
+        return info
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[ticker]
+
+def validate_ticker_with_retries(ticker, verbose=False, very_verbose=False, check_fields=False, info=None, out=None):
     """
     Validate a ticker with robust retry logic and optional field checking
     
@@ -61,99 +143,108 @@ def validate_ticker_with_retries(ticker, verbose=False, very_verbose=False, chec
         verbose (bool): Whether to print detailed information about the ticker
         very_verbose (bool): Whether to print all available fields
         check_fields (bool): Whether to check for completeness of key data fields
+        info (dict, optional): Already fetched ticker info, used for the first attempt
+        out (file, optional): Stream the verbose details are written to (stdout by default)
         
     Returns:
-        dict: Validation result with status and field information if check_fields=True
-              or True/False if check_fields=False
+        dict: Validation result with status and missing fields if check_fields=True
+              (plus the key field values in verbose mode), or True/False if check_fields=False
     """
+    if not TICKER_PATTERN.match(ticker):
+        logger.error("❌ %r is not a valid ticker symbol", ticker)
+        return False if not check_fields else {"status": "invalid_format"}
+    
+    out = out or sys.stdout
     max_retries = 3
     retries = 0
     validated = False
+    wait_time = RETRY_BASE_DELAY
     
     while retries <= max_retries and not validated:
         try:
-            logger.info(f"Attempting to validate {ticker} (attempt {retries + 1}/{max_retries + 1})...")
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            logger.info("Attempting to validate %s (attempt %d/%d)...", ticker, retries + 1, max_retries + 1)
+            if retries > 0:
+                # Retries use a fresh Ticker so a failed response is not served again; the
+                # cache only holds info with a price, so a successful retry is stored there
+                stock = yf.Ticker(ticker, session=get_session())
+                info = get_cached_info(stock) if USE_CACHE else stock.info
+            elif info is None:
+                info = fetch_info(ticker)
             
-            if info and 'regularMarketPrice' in info and info['regularMarketPrice'] is not None:
-                logger.info(f"✅ Successfully validated ticker: {ticker}")
-                logger.info(f"Market Price: {info.get('regularMarketPrice')}")
-                logger.info(f"Company Name: {info.get('shortName', 'N/A')}")
+            if info and has_price(info):
+                logger.info("✅ Successfully validated ticker: %s", ticker)
+                logger.info("Market Price: %s", info.get(PRICE_FIELD))
+                logger.info("Company Name: %s", info.get('shortName', 'N/A'))
                 
                 # Field checking logic (from validate_ticker.py)
                 if check_fields:
-                    # Get key stats and check for missing fields
-                    stats = {}
-                    missing = []
-                    
-                    for field in KEY_FIELDS:
-                        value = info.get(field)
-                        stats[field] = value
-                        if value is None:
-                            missing.append(field)
+                    # Pluck all key fields in one pass, then check for missing ones
+                    fields = dict(zip(KEY_FIELDS, map(info.get, KEY_FIELDS)))
+                    missing = [field for field, value in fields.items() if value is None]
                     
                     if missing:
-                        logger.info(f"⚠️ {ticker} is missing {len(missing)}/{len(KEY_FIELDS)} fields: {', '.join(missing)}")
+                        logger.info("⚠️ %s is missing %d/%d fields: %s", ticker, len(missing), len(KEY_FIELDS), ', '.join(missing))
                         status = "incomplete"
                     else:
-                        logger.info(f"✅ {ticker} has all required fields")
+                        logger.info("✅ %s has all required fields", ticker)
                         status = "complete"
                     
-                    # Print field values if verbose mode is enabled
+                    result = {
+                        "status": status,
+                        "missing_fields": missing
+                    }
+                    
+                    # Collect and print field values only if verbose mode is enabled
                     if verbose and info:
-                        print("\nKey fields:")
-                        for field, value in stats.items():
-                            print(f"  {field}: {value}")
+                        result["fields"] = fields
+                        key_fields = "\n".join(f"  {field}: {value}" for field, value in result["fields"].items())
+                        out.write("\nKey fields:\n" + key_fields + "\n")
                     
                     # Return detailed result
-                    return {
-                        "status": status,
-                        "missing_fields": missing,
-                        "fields": stats
-                    }
+                    return result
                 
                 # Print additional info if verbose mode is enabled
                 if verbose and info:
-                    print("\nDetailed information:")
-                    print(f"  Full Name: {info.get('longName', 'N/A')}")
-                    print(f"  Sector: {info.get('sector', 'N/A')}")
-                    print(f"  Industry: {info.get('industry', 'N/A')}")
-                    print(f"  Website: {info.get('website', 'N/A')}")
-                    print(f"  Market Cap: {info.get('marketCap', 'N/A')}")
-                    print(f"  52 Week High: {info.get('fiftyTwoWeekHigh', 'N/A')}")
-                    print(f"  52 Week Low: {info.get('fiftyTwoWeekLow', 'N/A')}")
+                    details = "\n".join(f"  {label}: {info.get(field, 'N/A')}" for label, field in VERBOSE_FIELDS)
+                    out.write("\nDetailed information:\n" + details + "\n")
                 
                 # Print all available fields if very_verbose is enabled
                 if very_verbose and info:
-                    print("\nAll available fields:")
-                    all_fields = list(info.keys())
-                    for i in range(0, len(all_fields), 5):
-                        chunk = all_fields[i:i+5]
-                        print("  " + ", ".join(chunk))
+                    # Group the field names five per line and write them in one go
+                    fields = iter(info)
+                    lines = []
+                    while chunk := list(itertools.islice(fields, 5)):
+                        lines.append("  " + ", ".join(chunk))
+                    out.write("\nAll available fields:\n" + "\n".join(lines) + "\n")
                 
                 # Return simple True if not checking fields
-                return True if not check_fields else {"status": "success", "fields": stats}
+                return True
             else:
                 if retries < max_retries:
                     retries += 1
-                    wait_time = 2 * (2 ** retries) * (1 + random.random())
-                    logger.warning(f"⚠️ Could not validate ticker: {ticker}. Retrying in {wait_time:.2f}s")
+                    wait_time = next_backoff(wait_time)
+                    logger.warning("⚠️ Could not validate ticker: %s. Retrying in %.2fs", ticker, wait_time)
                     time.sleep(wait_time)
                 else:
-                    logger.warning(f"❌ Could not validate ticker after {max_retries + 1} attempts: {ticker}")
+                    logger.warning("❌ Could not validate ticker after %d attempts: %s", max_retries + 1, ticker)
                     return False if not check_fields else {"status": "failed"}
-        except (ConnectionError, Timeout, HTTPError) as e:
+        except TRANSIENT_ERRORS as e:
+            status_code = http_status(e)
+            if status_code in NON_RETRYABLE_STATUS:
+                # Unknown ticker or rejected request; retrying cannot help
+                logger.error("❌ Non-retryable HTTP %d validating ticker %s: %s", status_code, ticker, e)
+                return False if not check_fields else {"status": "failed", "error": f"HTTP {status_code}"}
             if retries < max_retries:
                 retries += 1
-                wait_time = 3 * (2 ** retries) * (1 + random.random())  # Longer wait for HTTP errors
-                logger.warning(f"⚠️ Error validating ticker {ticker}: {str(e)}. Retrying in {wait_time:.2f}s")
+                # Honor the server's Retry-After when rate limited
+                wait_time = retry_after(e) or next_backoff(wait_time)
+                logger.warning("⚠️ Error validating ticker %s: %s. Retrying in %.2fs", ticker, e, wait_time)
                 time.sleep(wait_time)
             else:
-                logger.error(f"❌ Error validating ticker {ticker} after {max_retries + 1} attempts: {str(e)}")
+                logger.error("❌ Error validating ticker %s after %d attempts: %s", ticker, max_retries + 1, e)
                 return False if not check_fields else {"status": "failed", "error": str(e)}
         except Exception as e:
-            logger.error(f"❌ Unexpected error validating ticker {ticker}: {str(e)}")
+            logger.error("❌ Unexpected error validating ticker %s: %s", ticker, e)
             return False if not check_fields else {"status": "failed", "error": str(e)}
     
     return validated if not check_fields else {"status": "failed"}
@@ -169,54 +260,111 @@ def load_all_tickers():
     tickers = []
     
     if not os.path.exists(csv_file):
-        logger.error(f"CSV file not found: {csv_file}")
+        logger.error("CSV file not found: %s", csv_file)
         return tickers
     
     try:
+        # Count the leading lines that start with // so pandas can skip them
+        # ('/' itself cannot be the comment character: it may appear inside a field)
         with open(csv_file, 'r') as f:
-            # Skip lines that start with //
-            while True:
-                pos = f.tell()
-                line = f.readline()
-                if not line or not line.startswith('//'):
-                    f.seek(pos)
-                    break
-            
-            # Parse the CSV content
-            reader = csv.DictReader(f)
-            for row in reader:
-                if 'yahoo_ticker' in row and row['yahoo_ticker'].strip():
-                    tickers.append(row['yahoo_ticker'].strip())
+            comment_lines = sum(1 for _ in itertools.takewhile(lambda line: line.startswith('//'), f))
+        
+        # Only the yahoo_ticker column is parsed
+        df = pd.read_csv(csv_file, skiprows=comment_lines, usecols=['yahoo_ticker'], dtype=str)
+        column = df['yahoo_ticker'].dropna().str.strip()
+        tickers = column[column != ''].tolist()
         
-        logger.info(f"Loaded {len(tickers)} tickers from {csv_file}")
+        malformed = [ticker for ticker in tickers if not TICKER_PATTERN.match(ticker)]
+        if malformed:
+            logger.warning("Skipping malformed tickers: %s", ', '.join(malformed))
+            tickers = [ticker for ticker in tickers if TICKER_PATTERN.match(ticker)]
+        
+        logger.info("Loaded %d tickers from %s", len(tickers), csv_file)
     except Exception as e:
-        logger.error(f"Error loading tickers from CSV: {str(e)}")
+        logger.error("Error loading tickers from CSV: %s", e)
     
     return tickers
 
-def check_ticker_fields(ticker):
+def check_ticker_fields(ticker, info=None):
     """
     Check the completeness of key data fields for a given ticker
     
     Args:
         ticker (str): The ticker symbol to check
+        info (dict, optional): Already fetched ticker info
         
     Returns:
         bool: True if all key fields are present, False otherwise
     """
-    stock = yf.Ticker(ticker)
-    info = stock.info
+    if info is None:
+        info = fetch_info(ticker)
     
-    missing_fields = [field for field in KEY_FIELDS if field not in info or info[field] is None]
+    missing_fields = [field for field, value in zip(KEY_FIELDS, map(info.get, KEY_FIELDS)) if value is None]
     
     if missing_fields:
-        logger.warning(f"⚠️ Ticker {ticker} is missing key fields: {', '.join(missing_fields)}")
+        logger.warning("⚠️ Ticker %s is missing key fields: %s", ticker, ', '.join(missing_fields))
         return False
     else:
-        logger.info(f"✅ Ticker {ticker} has all key fields present")
+        logger.info("✅ Ticker %s has all key fields present", ticker)
         return True
 
+def run_ticker_checks(ticker, check_fields=False, verbose=False, very_verbose=False, out=None):
+    """
+    Run the selected checks for one ticker
+    
+    Args:
+        ticker (str): The ticker symbol to test
+        check_fields (bool): Whether to require all key data fields first
+        verbose (bool): Whether to print detailed information about the ticker
+        very_verbose (bool): Whether to print all available fields
+        out (file, optional): Stream the verbose details are written to (stdout by default)
+        
+    Returns:
+        tuple: (success, result message)
+    """
+    # Check fields first if --check-fields option is enabled; the fetched info
+    # is handed on so validation does not download it again
+    info = None
+    if check_fields:
+        info = fetch_info(ticker)
+        if not check_ticker_fields(ticker, info):
+            return False, "Result: ❌ Failed due to missing fields"
+    
+    success = validate_ticker_with_retries(ticker, verbose=verbose, very_verbose=very_verbose, info=info, out=out)
+    return success, f"Result: {'✅ Success' if success else '❌ Failed'}"
+
+def run_ticker_checks_buffered(ticker, check_fields=False, verbose=False, very_verbose=False):
+    """
+    Run the checks for one ticker, collecting its verbose details in a buffer
+    
+    Used from worker threads, so that each ticker's details can be written
+    together with its banner and result instead of mixing with other tickers.
+    
+    Returns:
+        tuple: (success, verbose details followed by the result message)
+    """
+    out = io.StringIO()
+    success, message = run_ticker_checks(ticker, check_fields, verbose, very_verbose, out=out)
+    return success, out.getvalue() + message
+
+def ticker_header(ticker):
+    """Return the banner separating the output of each ticker"""
+    return f"\n{'=' * 50}\nTesting ticker: {ticker}\n{'=' * 50}\n"
+
+def print_ticker_result(ticker, message):
+    """Print the banner and result line of a ticker with a single write"""
+    sys.stdout.write(ticker_header(ticker) + message + "\n")
+
 if __name__ == "__main__":
+    # Setup logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
+    
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Comprehensive ticker validation tool for Yahoo Finance tickers")
     parser.add_argument("tickers", nargs="*", help="One or more ticker symbols to validate")
@@ -224,10 +372,15 @@ if __name__ == "__main__":
     parser.add_argument("--very-verbose", "-vv", action="store_true", help="Show all available fields for each ticker")
     parser.add_argument("--check-fields", "-c", action="store_true", help="Check for completeness of key data fields")
     parser.add_argument("--all", "-a", action="store_true", help="Validate all tickers from amsterdam_aex_tickers.csv")
+    parser.add_argument("--threads", "-t", type=int, default=8,
+                      help="Number of tickers validated concurrently (default: 8)")
     parser.add_argument("--wait", "-w", type=float, default=3.0, 
-                      help="Wait time in seconds between ticker validations (default: 3.0)")
+                      help="Wait time in seconds between serial ticker validations (default: 3.0)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the on-disk cache of ticker info")
     args = parser.parse_args()
     
+    USE_CACHE = not args.no_cache
+    
     # Determine which tickers to test
     tickers_to_test = []
     
@@ -245,43 +398,79 @@ if __name__ == "__main__":
         print("\nError: You must specify at least one ticker symbol or use the --all flag")
         sys.exit(1)
     
-    print(f"Will validate {len(tickers_to_test)} tickers" + 
-          (f" with {args.wait}s delay between tests" if len(tickers_to_test) > 1 else ""))
+    # Create the Ticker objects for all tickers in one batch sharing the HTTP session;
+    # their info is then fetched by the worker threads below
+    if len(tickers_to_test) > 1:
+        TICKER_BATCH.update(yf.Tickers(" ".join(tickers_to_test), session=get_session()).tickers)
+    
+    # Validation is network-bound, so tickers are checked concurrently unless
+    # serial mode is requested with --threads 1
+    concurrent = args.threads > 1 and len(tickers_to_test) > 1
+    
+    if concurrent:
+        print(f"Will validate {len(tickers_to_test)} tickers using {args.threads} threads")
+    else:
+        print(f"Will validate {len(tickers_to_test)} tickers" + 
+              (f" with {args.wait}s delay between tests" if len(tickers_to_test) > 1 else ""))
     
     # Track results
     results = {
         "success": [],
         "failed": []
     }
+    outcomes = {}
+    verbose = args.verbose or args.very_verbose
     
-    # Test each ticker with improved validation
+    # Malformed symbols are rejected without any network request
     for ticker in tickers_to_test:
-        print(f"\n{'=' * 50}")
-        print(f"Testing ticker: {ticker}")
-        print(f"{'=' * 50}")
-        
-        # Check fields first if --check-fields option is enabled
-        if args.check_fields:
-            fields_success = check_ticker_fields(ticker)
-            if not fields_success:
-                results["failed"].append(ticker)
-                print("Result: ❌ Failed due to missing fields")
-                continue  # Skip to next ticker
-        
-        success = validate_ticker_with_retries(ticker, verbose=args.verbose or args.very_verbose)
-        
-        print(f"Result: {'✅ Success' if success else '❌ Failed'}")
-        
-        # Track result
-        if success:
+        if not TICKER_PATTERN.match(ticker):
+            outcomes[ticker] = False
+            print_ticker_result(ticker, "Result: ❌ Failed - not a valid ticker symbol")
+    remaining = [ticker for ticker in tickers_to_test if ticker not in outcomes]
+    
+    # One concurrent pass over Yahoo's chart endpoint (no crumb handshake needed)
+    # finds tickers Yahoo does not know, which then skip the info download and its retries;
+    # it is no more concurrent than the validation itself, so --threads 1 stays serial
+    if len(remaining) > 1:
+        charts = fetch_charts(remaining, range="1d", max_concurrency=args.threads if concurrent else 1)
+        for ticker in remaining:
+            if charts.get(ticker) == {}:
+                outcomes[ticker] = False
+                print_ticker_result(ticker, "Result: ❌ Failed - no quote data on Yahoo Finance")
+        remaining = [ticker for ticker in tickers_to_test if ticker not in outcomes]
+    
+    if concurrent:
+        # Results are printed as they complete; the summary keeps the input order
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            futures = {
+                executor.submit(run_ticker_checks_buffered, ticker, args.check_fields, verbose, args.very_verbose): ticker
+                for ticker in remaining
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                outcomes[ticker], message = future.result()
+                print_ticker_result(ticker, message)
+    else:
+        # Test each ticker with improved validation
+        last_index = len(remaining) - 1
+        for i, ticker in enumerate(remaining):
+            sys.stdout.write(ticker_header(ticker))
+            outcomes[ticker], message = run_ticker_checks(ticker, args.check_fields, verbose, args.very_verbose)
+            
+            # Wait between tests to avoid rate limiting (only if more tickers to test)
+            if i != last_index and args.wait > 0:
+                sys.stdout.write(f"{message}\nWaiting {args.wait}s before next ticker...\n")
+                sys.stdout.flush()
+                time.sleep(args.wait)
+            else:
+                sys.stdout.write(message + "\n")
+    
+    # Track result
+    for ticker in tickers_to_test:
+        if outcomes[ticker]:
             results["success"].append(ticker)
         else:
             results["failed"].append(ticker)
-        
-        # Wait between tests to avoid rate limiting (only if more tickers to test)
-        if ticker != tickers_to_test[-1] and args.wait > 0:
-            print(f"Waiting {args.wait}s before next ticker...")
-            time.sleep(args.wait)
     
     # Print summary
     print("\n" + "=" * 50)
@@ -292,8 +481,7 @@ if __name__ == "__main__":
     
     if results["failed"]:
         print("\nFailed tickers:")
-        for ticker in results["failed"]:
-            print(f"  - {ticker}")
+        sys.stdout.writelines(f"  - {ticker}\n" for ticker in results["failed"])
     
     if not results["success"] and results["failed"]:
         sys.exit(1)  # Exit with error if all tickers failed
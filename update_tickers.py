@@ -4,15 +4,18 @@ AEX Tickers Updater - Fetches current AEX stock tickers using yfinance API
 Updates the tickers.json file with the latest components of the AEX index
 """
 
-import json
+import orjson
 import os
 import logging
 import sys
 import time
-import random
-import yfinance as yf
-from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
-import csv
+import shutil
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import (
+    Retrying, stop_after_attempt,
+    retry_if_exception_type, retry_if_result, before_sleep_log
+)
 
 # Setup logging
 logging.basicConfig(
@@ -25,11 +28,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# yfinance and pandas are imported inside the functions that use them, so
+# --help and argument errors return without loading them
+
 # AEX index ticker
 AEX_INDEX_TICKER = "^AEX"
 
 # Import ticker validation settings from central configuration
 from aex_tickers import load_tickers
+from yahoo_chart import fetch_charts
+from data_cache import cached
+from file_utils import write_atomic
+from http_session import get_session, TRANSIENT_ERRORS, next_backoff, retry_after
+
+# Maximum number of validation requests in flight at once; kept low to avoid rate limiting
+MAX_CONCURRENT_VALIDATIONS = 5
+
+# Prices read during validation are cached on disk for an hour (disabled with --no-cache)
+INFO_CACHE_TTL = 60 * 60  # 1 hour in seconds
+USE_CACHE = True
 
 # Global parameters for validation
 VALIDATION_PARAMS = {
@@ -38,7 +55,17 @@ VALIDATION_PARAMS = {
     'http_error_multiplier': 3
 }
 
-def validate_ticker_with_retries(ticker, max_retries=3, base_wait=2, http_error_multiplier=3):
+@cached('last_price', ttl=INFO_CACHE_TTL)
+def get_cached_last_price(stock):
+    """
+    Return the last traded price of a ticker, served from the on-disk cache when fresh
+    
+    fast_info reads the small chart payload instead of the much larger
+    quoteSummary behind .info, which is all validation needs.
+    """
+    return stock.fast_info.last_price
+
+def validate_ticker_with_retries(ticker, max_retries=3, base_wait=2, http_error_multiplier=3, stock=None):
     """
     Validate a ticker with robust retry logic
     
@@ -47,43 +74,131 @@ def validate_ticker_with_retries(ticker, max_retries=3, base_wait=2, http_error_
         max_retries (int): Maximum number of retry attempts
         base_wait (int): Base wait time in seconds for the exponential backoff
         http_error_multiplier (int): Multiplier for HTTP errors to increase wait time
+        stock (yf.Ticker): Optional Ticker object for the first attempt, e.g. from a yf.Tickers batch
         
     Returns:
         bool: True if validation successful, False otherwise
     """
-    retries = 0
+    import yfinance as yf
     
-    while retries <= max_retries:
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            if info and 'regularMarketPrice' in info and info['regularMarketPrice'] is not None:
-                logger.info(f"Validated ticker: {ticker}")
-                return True
-            else:
-                if retries < max_retries:
-                    retries += 1
-                    wait_time = base_wait * (2 ** retries) * (1 + random.random())
-                    logger.debug(f"Could not validate ticker: {ticker}. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    logger.warning(f"Could not validate ticker: {ticker}")
-                    return False
-        except (ConnectionError, Timeout, HTTPError) as e:
-            if retries < max_retries:
-                retries += 1
-                # Use a longer wait time for HTTP errors
-                wait_time = base_wait * http_error_multiplier * (2 ** retries) * (1 + random.random())
-                logger.debug(f"Error validating ticker {ticker}: {str(e)}. Retrying in {wait_time:.2f}s (attempt {retries}/{max_retries})")
-                time.sleep(wait_time)
-            else:
-                logger.warning(f"Error validating ticker {ticker}: {str(e)}")
-                return False
-        except Exception as e:
-            logger.warning(f"Unexpected error validating ticker {ticker}: {str(e)}")
-            return False
+    # The first attempt may use the given Ticker; yfinance keeps fetched data
+    # on the object, so retries use a fresh one
+    stocks = iter([stock] if stock is not None else [])
+    
+    def fetch_last_price():
+        # Missing prices are not cached, so retries query Yahoo again
+        current = next(stocks, None) or yf.Ticker(ticker, session=get_session())
+        return get_cached_last_price(current) if USE_CACHE else current.fast_info.last_price
     
-    return False
+    wait_time = base_wait
+    
+    def next_wait(retry_state):
+        nonlocal wait_time
+        error = retry_state.outcome.exception()
+        # Honor the server's Retry-After when rate limited
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            return server_delay
+        # Decorrelated jitter spreads out retries; HTTP errors start from a longer base
+        base = base_wait * http_error_multiplier if error is not None else base_wait
+        wait_time = next_backoff(wait_time, base)
+        return wait_time
+    
+    retrying = Retrying(
+        stop=stop_after_attempt(max_retries + 1),
+        wait=next_wait,
+        retry=retry_if_exception_type(TRANSIENT_ERRORS) | retry_if_result(lambda price: price is None),
+        before_sleep=before_sleep_log(logger, logging.DEBUG),
+        # Once retries run out, return the last price (None) or re-raise the last error
+        retry_error_callback=lambda retry_state: retry_state.outcome.result()
+    )
+    
+    try:
+        last_price = retrying(fetch_last_price)
+    except TRANSIENT_ERRORS as e:
+        logger.warning(f"Error validating ticker {ticker}: {str(e)}")
+        return False
+    except Exception as e:
+        logger.warning(f"Unexpected error validating ticker {ticker}: {str(e)}")
+        return False
+    
+    if last_price is None:
+        logger.warning(f"Could not validate ticker: {ticker}")
+        return False
+    
+    logger.debug(f"Validated ticker: {ticker}")
+    return True
+
+def download_live_tickers(tickers):
+    """
+    Find the tickers with recent prices using one multi-threaded yf.download
+    
+    Args:
+        tickers (list): Ticker symbols to probe
+        
+    Returns:
+        set: Tickers with at least one recent close, or None if the download failed
+    """
+    import yfinance as yf
+    import pandas as pd
+    
+    try:
+        closes = yf.download(tickers, period="5d", progress=False, threads=True, session=get_session())['Close']
+    except Exception as e:
+        logger.warning(f"Could not download recent prices: {str(e)}")
+        return None
+    
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(name=tickers[0])
+    
+    live = {ticker for ticker in tickers if ticker in closes.columns and not closes[ticker].isna().all()}
+    if not live:
+        # yfinance reports rate limits and failed requests as empty or all-NaN
+        # columns rather than raising, and that is far more likely than none of
+        # the tickers trading
+        logger.warning("Recent price download returned no data")
+        return None
+    return live
+
+def validate_fallback_tickers(tickers):
+    """
+    Validate tickers whose chart request failed
+    
+    One multi-threaded yf.download validates them all at once. Only if that
+    download fails as a whole are the tickers validated one by one, with retries;
+    a ticker without recent closes in a working download has no price to find
+    one by one either.
+    
+    Args:
+        tickers (list): Ticker symbols to validate
+        
+    Returns:
+        dict: Ticker symbol to True if valid, False otherwise
+    """
+    import yfinance as yf
+    
+    live = download_live_tickers(tickers)
+    if live is not None:
+        return {ticker: ticker in live for ticker in tickers}
+    
+    # Build all Ticker objects in one go on the shared session
+    bulk = yf.Tickers(" ".join(tickers), session=get_session())
+    
+    def validate_one(ticker):
+        # Use global validation parameters
+        return validate_ticker_with_retries(
+            ticker, 
+            max_retries=VALIDATION_PARAMS['max_retries'], 
+            base_wait=VALIDATION_PARAMS['base_wait'],
+            http_error_multiplier=VALIDATION_PARAMS['http_error_multiplier'],
+            stock=bulk.tickers.get(ticker.upper())
+        )
+    
+    # The lookups are network-bound, so a few threads validate them in parallel;
+    # the small pool keeps the request rate low enough to avoid rate limiting
+    logger.info("Validating %d tickers one by one", len(tickers))
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_VALIDATIONS) as executor:
+        return dict(zip(tickers, executor.map(validate_one, tickers)))
 
 def fetch_aex_components(validate=True):
     """
@@ -95,21 +210,24 @@ def fetch_aex_components(validate=True):
     Returns:
         list: List of ticker symbols
     """
+    import yfinance as yf
+    import pandas as pd
+    
     logger.info(f"Fetching AEX components using yfinance")
     
     try:
         # Get AEX index data
-        aex_index = yf.Ticker(AEX_INDEX_TICKER)
+        aex_index = yf.Ticker(AEX_INDEX_TICKER, session=get_session())
         
         # Attempt to get components
         components = []
         
         # First method: Try to get components directly (may not work for all indices)
         try:
+            # The index's .info is not consulted: it is a heavy quoteSummary request
+            # and its dict never carries a components attribute
             if hasattr(aex_index, 'components'):
                 components = list(aex_index.components)
-            elif hasattr(aex_index.info, 'components'):
-                components = list(aex_index.info['components'])
         except Exception as e:
             logger.warning(f"Could not get components directly: {e}")
         
@@ -121,21 +239,15 @@ def fetch_aex_components(validate=True):
             
             try:
                 if os.path.exists(csv_file):
+                    # Count the leading lines that start with // so pandas can skip them
+                    # ('/' itself cannot be the comment character: it may appear inside a field)
                     with open(csv_file, 'r') as f:
-                        # Skip lines that start with //
-                        while True:
-                            pos = f.tell()
-                            line = f.readline()
-                            if not line or not line.startswith('//'):
-                                f.seek(pos)
-                                break
-                        
-                        # Parse the CSV content
-                        import csv
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            if 'yahoo_ticker' in row and row['yahoo_ticker'].strip():
-                                potential_tickers.append(row['yahoo_ticker'].strip())
+                        comment_lines = sum(1 for _ in itertools.takewhile(lambda line: line.startswith('//'), f))
+                    
+                    # Only the yahoo_ticker column is parsed; a missing column raises ValueError
+                    df = pd.read_csv(csv_file, skiprows=comment_lines, usecols=['yahoo_ticker'], dtype=str)
+                    column = df['yahoo_ticker'].dropna().str.strip()
+                    potential_tickers = column[column != ''].tolist()
                     
                     if not potential_tickers:
                         logger.warning("CSV file found but no tickers extracted")
@@ -153,40 +265,41 @@ def fetch_aex_components(validate=True):
                 logger.error("3. Ensure the file permissions allow reading")
                 return None
             
-            # Remove duplicates
+            # Remove duplicates before validating so no ticker is requested twice
             potential_tickers = list(dict.fromkeys(potential_tickers))
             
             if validate:
-                # Validate each ticker by trying to fetch its data with retry logic
-                valid_tickers = []
+                # Validate all tickers concurrently from their charts, which are
+                # requested from one asyncio event loop with bounded concurrency
+                charts = fetch_charts(potential_tickers, range="1d",
+                                      max_retries=VALIDATION_PARAMS['max_retries'],
+                                      max_concurrency=MAX_CONCURRENT_VALIDATIONS)
+                valid = {
+                    ticker: chart.get('meta', {}).get('regularMarketPrice') is not None
+                    for ticker, chart in charts.items() if chart is not None
+                }
                 
-                for ticker in potential_tickers:
-                    # Add a small delay between requests to avoid overloading the API
-                    time.sleep(0.2)
-                    
-                    # Use global validation parameters
-                    if validate_ticker_with_retries(
-                        ticker, 
-                        max_retries=VALIDATION_PARAMS['max_retries'], 
-                        base_wait=VALIDATION_PARAMS['base_wait'],
-                        http_error_multiplier=VALIDATION_PARAMS['http_error_multiplier']
-                    ):
-                        valid_tickers.append(ticker)
+                # Tickers whose chart request failed are validated through yfinance
+                fallback_tickers = [ticker for ticker in potential_tickers if ticker not in valid]
+                if fallback_tickers:
+                    valid.update(validate_fallback_tickers(fallback_tickers))
+                
+                # Keep the tickers in their original order
+                components = [ticker for ticker in potential_tickers if valid.get(ticker)]
                 
-                components = valid_tickers
+                # One summary line instead of a log record per ticker
+                logger.info("Validated %d/%d tickers: %s", len(components), len(potential_tickers), ", ".join(components))
+                failed = [ticker for ticker in potential_tickers if not valid.get(ticker)]
+                if failed:
+                    logger.warning("Could not validate %d tickers: %s", len(failed), ", ".join(failed))
             else:
                 logger.info("Skipping validation, using all potential tickers")
                 components = potential_tickers
         
-        # Ensure all tickers have the .AS suffix and remove duplicates
-        formatted_tickers = []
-        seen = set()
-        for ticker in components:
-            if not ticker.endswith('.AS'):
-                ticker = f"{ticker}.AS"
-            if ticker not in seen:
-                formatted_tickers.append(ticker)
-                seen.add(ticker)
+        # Ensure all tickers have the .AS suffix and remove duplicates, keeping their order
+        formatted_tickers = list(dict.fromkeys(
+            ticker if ticker.endswith('.AS') else f"{ticker}.AS" for ticker in components
+        ))
         
         if formatted_tickers:
             logger.info(f"Found {len(formatted_tickers)} AEX components")
@@ -213,20 +326,17 @@ def update_tickers_file(tickers):
     
     # Create a backup of the current file
     if os.path.exists(tickers_file):
-        with open(tickers_file, 'r') as f:
-            original_content = f.read()
-        
-        with open(backup_file, 'w') as f:
-            f.write(original_content)
+        # Copied by the kernel without reading the file into memory
+        shutil.copyfile(tickers_file, backup_file)
         logger.info(f"Created backup of tickers.json at {backup_file}")
     
     # Update the tickers.json file
     try:
         data = {"AEX_TICKERS": tickers}
         
-        # Write the JSON content directly without filepath comment
-        with open(tickers_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        # Write the JSON content (without filepath comment) to a temporary file and
+        # swap it in, so a crash never leaves a truncated tickers.json behind
+        write_atomic(tickers_file, orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Updated {tickers_file} with {len(tickers)} tickers")
         return True
@@ -252,12 +362,15 @@ def main():
                       help='Base wait time in seconds for backoff strategy (default: 2)')
     parser.add_argument('--http-multiplier', type=int, default=3,
                       help='Wait time multiplier for HTTP errors (default: 3)')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Ignore cached ticker prices and query Yahoo Finance again')
     args = parser.parse_args()
     
     print("Updating AEX tickers from Yahoo Finance...")
     
     # Update global validation parameters
-    global VALIDATION_PARAMS
+    global VALIDATION_PARAMS, USE_CACHE
+    USE_CACHE = not args.no_cache
     VALIDATION_PARAMS = {
         'max_retries': args.retries,
         'base_wait': args.base_wait,
@@ -279,8 +392,7 @@ def main():
     
     # Display the tickers
     print(f"\nFound {len(tickers)} AEX components:")
-    for i, ticker in enumerate(tickers, 1):
-        print(f"  {i}. {ticker}")
+    sys.stdout.writelines(f"  {i}. {ticker}\n" for i, ticker in enumerate(tickers, 1))
     
     if args.dry_run:
         print("\n✓ Dry run completed. No changes were made.")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+AEX Yahoo Chart - Concurrent requests to Yahoo Finance's chart endpoint
+
+The chart endpoint needs no cookie/crumb handshake, so validation-only checks
+(is the ticker known, is it trading, what is its price) can request it for
+many tickers at once from a single asyncio event loop instead of going
+through yfinance one ticker at a time.
+
+Usage:
+    from yahoo_chart import fetch_charts
+
+    charts = fetch_charts(["ASML.AS", "INGA.AS"], range="1mo")
+    chart = charts["ASML.AS"]  # {} for unknown tickers, None if the request failed
+    price = chart["meta"]["regularMarketPrice"]
+"""
+
+import asyncio
+import logging
+import orjson
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+from http_session import IMPERSONATE, HTTP_VERSION, TRANSIENT_ERRORS as HTTP_TRANSIENT_ERRORS, retry_after
+
+logger = logging.getLogger(__name__)
+
+# Yahoo Finance chart endpoint
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+
+# Maximum number of requests in flight at once
+MAX_CONCURRENT_REQUESTS = 20
+
+# Errors worth retrying; asyncio's own timeouts on top of the shared network errors
+TRANSIENT_ERRORS = HTTP_TRANSIENT_ERRORS + (asyncio.TimeoutError,)
+
+# Backoff for retries without a server-supplied delay
+backoff = wait_random_exponential(multiplier=2, max=30)
+
+def wait_retry_after(retry_state):
+    """Wait as long as a 429 response's Retry-After header asks (up to RETRY_MAX_DELAY), else use jittered backoff"""
+    delay = retry_after(retry_state.outcome.exception())
+    return delay if delay is not None else backoff(retry_state)
+
+async def fetch_chart(session, semaphore, ticker, params, max_retries=3):
+    """
+    Fetch the chart of one ticker
+
+    Args:
+        session (AsyncSession): Shared asynchronous HTTP session
+        semaphore (asyncio.Semaphore): Bounds the number of requests in flight
+        ticker (str): Ticker symbol
+        params (dict): Query parameters, e.g. {"range": "1mo", "interval": "1d"}
+        max_retries (int): Maximum number of retry attempts
+
+    Returns:
+        dict: The chart result (with 'meta', 'timestamp' and 'indicators'), an empty
+              dict if Yahoo has no data for the ticker, or None if the request failed
+    """
+    async with semaphore:
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(max_retries + 1),
+                wait=wait_retry_after,
+                retry=retry_if_exception_type(TRANSIENT_ERRORS),
+                reraise=True
+            ):
+                with attempt:
+                    response = await session.get(CHART_URL.format(ticker=ticker), params=params, timeout=15)
+                    # Rate limiting and server errors are retried; 404 means an unknown ticker
+                    if response.status_code == 429 or response.status_code >= 500:
+                        response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Chart request failed for {ticker}: {str(e)}")
+            return None
+
+    if response.status_code == 404:
+        return {}
+    if response.status_code != 200:
+        logger.warning(f"Chart request for {ticker} returned HTTP {response.status_code}")
+        return None
+    try:
+        results = orjson.loads(response.content).get("chart", {}).get("result") or []
+    except (orjson.JSONDecodeError, AttributeError) as e:
+        # e.g. a consent page or an HTML error page served with HTTP 200
+        logger.warning(f"Chart response for {ticker} is not valid chart JSON: {str(e)}")
+        return None
+    return results[0] if results else {}
+
+async def fetch_charts_async(tickers, params, max_retries=3, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """Fetch the charts of all tickers concurrently over one session"""
+    from curl_cffi.requests import AsyncSession
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # One HTTP/2 connection carries the concurrent requests
+    async with AsyncSession(impersonate=IMPERSONATE, http_version=HTTP_VERSION) as session:
+        charts = await asyncio.gather(*(fetch_chart(session, semaphore, t, params, max_retries) for t in tickers),
+                                      return_exceptions=True)
+    # An unexpected error for one ticker marks only that ticker as failed
+    for ticker, chart in zip(tickers, charts):
+        if isinstance(chart, Exception):
+            logger.warning(f"Chart request failed for {ticker}: {str(chart)}")
+    return {ticker: None if isinstance(chart, Exception) else chart for ticker, chart in zip(tickers, charts)}
+
+def fetch_charts(tickers, range="1mo", interval="1d", max_retries=3, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """
+    Fetch the charts of many tickers concurrently
+
+    Args:
+        tickers (list): Ticker symbols
+        range (str): Period covered by the chart, e.g. '1d', '1mo'
+        interval (str): Bar interval, e.g. '1d'
+        max_retries (int): Maximum number of retry attempts per ticker
+        max_concurrency (int): Maximum number of requests in flight at once
+
+    Returns:
+        dict: Ticker symbol to its chart result ({} for unknown tickers, None where
+              the request failed)
+    """
+    params = {"range": range, "interval": interval}
+    return asyncio.run(fetch_charts_async(tickers, params, max_retries, max_concurrency))